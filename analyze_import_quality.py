@@ -38,11 +38,6 @@ from pathlib import Path
 # Ajouter le répertoire parent au path pour l'import
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.db.session import SessionLocal
-from app.services.element_search import ElementSearchService
-from app.db.models.client import Client
-from app.db.models.dpgf import DPGF
-
 
 def setup_logging(verbose: bool = False) -> logging.Logger:
     """Configure le logging"""
@@ -80,6 +75,10 @@ def analyze_quality(
     
     logger.info("Démarrage de l'analyse de qualité des imports DPGF")
     
+    # Imports différés : --help et les erreurs d'arguments ne chargent ni SQLAlchemy ni les modèles
+    from app.db.session import SessionLocal
+    from app.services.element_search import ElementSearchService
+    
     # Créer une session de base de données
     db = SessionLocal()
     
@@ -18,7 +18,7 @@ import json
 sys.path.append(str(Path(__file__).parent))
 
 from scripts.import_complete import DPGFImporter, ExcelParser
-from scripts.identify_relevant_files_sharepoint import SharePointClient
+from scripts.identify_relevant_files_sharepoint import SharePointClient, get_client
 
 
 class PerformanceAnalyzer:
@@ -331,7 +331,7 @@ def main():
     # 2. Test fichiers SharePoint
     print("\\n2️⃣ Test performance fichiers SharePoint...")
     try:
-        sharepoint_client = SharePointClient()
+        sharepoint_client = get_client()
         
         # Quelques fichiers test représentatifs
         test_files = [
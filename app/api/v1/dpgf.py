@@ -7,10 +7,8 @@ from app.api.deps import get_db
 from typing import Any, Dict
 import os
 import io
-import shutil
-import tempfile
 from pathlib import Path
-from app.services.dpgf_import import DPGFImportService
+from app.services.dpgf_import import get_import_service
 import traceback
 
 router = APIRouter(prefix='/dpgf', tags=['dpgf'])
@@ -27,27 +25,18 @@ async def upload_dpgf(
     sans passer par un script externe.
     """
     try:
-        # Sauvegarder le fichier temporairement
+        # Garder le fichier en mémoire (pas d'écriture sur disque)
         print(f"Réception du fichier: {file.filename}")
-        tmpdir = tempfile.mkdtemp()
-        file_path = os.path.join(tmpdir, file.filename)
-        
-        with open(file_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
-        
-        print(f"Fichier sauvegardé à: {file_path}")
+        content = await file.read()
+        print(f"Fichier reçu: {len(content)} octets")
         
         # Récupérer la clé Gemini de l'environnement (optionnelle)
         gemini_key = os.environ.get('GEMINI_API_KEY', '')
         use_gemini = bool(gemini_key)
         
-        # Créer le service d'import et traiter le fichier
+        # Récupérer le service d'import partagé et traiter le fichier
         print("Initialisation du service d'import...")
-        import_service = DPGFImportService(
-            gemini_key=gemini_key,
-            use_gemini=use_gemini
-        )
+        import_service = get_import_service(gemini_key, use_gemini)
         
         print("Lancement de l'import...")
         # Capturer la sortie standard pour la retourner à l'utilisateur
@@ -59,14 +48,11 @@ async def upload_dpgf(
         sys.stdout = import_results
         
         # Exécuter l'import
-        dpgf_id = import_service.import_file(db, file_path)
+        dpgf_id = import_service.import_file(db, file.filename, file_obj=io.BytesIO(content))
         
         # Restaurer stdout
         sys.stdout = original_stdout
         
-        # Nettoyer les fichiers temporaires
-        shutil.rmtree(tmpdir)
-        
         if not dpgf_id:
             raise HTTPException(status_code=500, detail="Erreur lors de l'import du DPGF")
         
@@ -78,10 +64,6 @@ async def upload_dpgf(
         }
     
     except Exception as e:
-        # Nettoyer en cas d'erreur
-        if 'tmpdir' in locals() and os.path.exists(tmpdir):
-            shutil.rmtree(tmpdir)
-        
         print(f"Erreur upload: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'import: {str(e)}")
@@ -16,7 +16,7 @@ from pydantic import BaseModel
 import traceback
 
 # Import des services d'analyse et modèles
-from app.services.dpgf_import import DPGFImportService
+from app.services.dpgf_import import get_import_service
 from app.crud import element_ouvrage as element_crud
 from app.crud import section as section_crud
 from app.crud import lot as lot_crud
@@ -78,10 +78,7 @@ async def upload_and_analyze_dpgf(
         use_gemini = bool(gemini_key)
         
         # 3. Charger le fichier et extraire les éléments d'ouvrage
-        import_service = DPGFImportService(
-            gemini_key=gemini_key,
-            use_gemini=use_gemini
-        )
+        import_service = get_import_service(gemini_key, use_gemini)
         
         # Extraire les données du fichier sans les importer
         extracted_data = import_service.extract_data_from_file(file_path, auto_detect=True)
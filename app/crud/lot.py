@@ -11,6 +11,10 @@ def get_lots(db: Session, skip: int = 0, limit: int = 100) -> list[Lot]:
     return db.query(Lot).offset(skip).limit(limit).all()
 
 
+def get_lots_by_dpgf(db: Session, dpgf_id: int, skip: int = 0, limit: int = 100) -> list[Lot]:
+    return db.query(Lot).filter(Lot.id_dpgf == dpgf_id).order_by(Lot.numero_lot).offset(skip).limit(limit).all()
+
+
 def create_lot(db: Session, lot: LotCreate) -> Lot:
     db_lot = Lot(**lot.dict())
     db.add(db_lot)
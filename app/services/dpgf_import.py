@@ -8,9 +8,11 @@ import re
 import hashlib
 import pickle
 import json
-from typing import Optional, Dict, List, Tuple, Any
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple, Any, BinaryIO
 from datetime import date
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 import requests
@@ -39,6 +41,14 @@ from app.schemas.lot import LotCreate
 from app.schemas.section import SectionCreate
 from app.schemas.element_ouvrage import ElementOuvrageCreate
 
+# Indicateurs d'unité signalant un élément d'ouvrage même sans prix
+ELEMENT_UNIT_INDICATORS = ('m2', 'm²', 'ml', 'u', 'ens', 'ensemble', 'unité', 'unite', 'forfait', 'ft')
+ELEMENT_UNIT_PATTERN = '|'.join(re.escape(indicator) for indicator in ELEMENT_UNIT_INDICATORS)
+
+# Sections numérotées (ex: "1.2 Section Title") et titres en majuscules sans numéro
+SECTION_NUMBER_PATTERN = re.compile(r'^(\d+(?:\.\d+)*)\s+(.*)')
+SECTION_TITLE_PATTERN = re.compile(r'^([A-Z][A-Z\s\d\.]+)$')
+
 
 class ImportStats:
     """Statistiques d'import"""
@@ -184,9 +194,41 @@ class GeminiProcessor:
 class ExcelParser:
     """Analyse les fichiers Excel DPGF avec détection de colonnes améliorée"""
     
-    def __init__(self, file_path: str):
+    # Patterns de section compilés une seule fois (similaires au script de production)
+    _SECTION_PATTERNS = (
+        re.compile(r'^(\d+(?:\.\d+)*)\s+(.+)', re.IGNORECASE),  # Format numéroté (ex: "1.2 Section Title")
+        re.compile(r'^([A-Z][A-Z0-9\s\.\-\_]{3,})$', re.IGNORECASE),  # Titre en majuscules long
+        re.compile(r'^(CHAPITRE\s+[A-Z0-9]+|LOT\s+[A-Z0-9]+)[\s\:]+(.+)', re.IGNORECASE),  # Chapitre/Lot
+        re.compile(r'^(SOUS[\-\s]TOTAL|TOTAL)[\s\:]*(.*)', re.IGNORECASE),  # Totaux et sous-totaux
+        re.compile(r'^([A-Z]{3,}[\s\-]*)+$', re.IGNORECASE),  # Plusieurs mots en majuscules
+    )
+    
+    # Libellés de totaux reconnus directement, sans passer par les regex
+    _TOTAL_KEYWORDS = frozenset({'TOTAL', 'SOUS-TOTAL', 'SOUS TOTAL', 'TOTAL HT', 'TOTAL TTC', 'MONTANT TOTAL'})
+    
+    # Numéro + titre ("2.1 Escaliers métalliques"), profondeur bornée pour éviter les retours arrière
+    _NUM_RE = re.compile(r'(\d+(?:\.\d+){0,9})\s+(.+)')
+    _SECTION_NUMBER_RE = re.compile(r'\d+(?:\.\d+){0,9}')
+    _UPPER_TITLE_RE = re.compile(r'[A-Z][A-Z0-9\.\s\-\_]{3,}$')
+    
+    # Patterns spéciaux avec numérotation claire : (pattern, extraction numéro/titre)
+    _SPECIAL_SECTION_PATTERNS = (
+        # CHAPITRE 2: Menuiseries → numero="CHAPITRE 2", titre="Menuiseries"
+        (re.compile(r'^(CHAPITRE\s+[A-Z0-9]+)[\s\:]+(.+)', re.IGNORECASE), lambda m: (m.group(1), m.group(2))),
+        # LOT 06 - MÉTALLERIE → numero="LOT 06", titre="MÉTALLERIE"
+        (re.compile(r'^(LOT\s+[A-Z0-9]+)[\s\:]+(.+)', re.IGNORECASE), lambda m: (m.group(1), m.group(2))),
+        # SOUS-TOTAL Escaliers → numero="SOUS-TOTAL", titre="Escaliers"
+        (re.compile(r'^(SOUS[\-\s]TOTAL|TOTAL)[\s\:]*(.*)', re.IGNORECASE), lambda m: (m.group(1), m.group(2) if m.group(2) else m.group(1))),
+    )
+    
+    def __init__(self, file_path: str, file_obj: Optional[BinaryIO] = None):
+        """
+        Args:
+            file_path: Chemin ou nom du fichier (utilisé pour la détection client/lot)
+            file_obj: Contenu du fichier déjà en mémoire (ex: BytesIO), lu à la place du disque
+        """
         self.file_path = file_path
-        self.df = pd.read_excel(file_path, engine='openpyxl', header=None)
+        self.df = pd.read_excel(file_obj if file_obj is not None else file_path, engine='openpyxl', header=None)
         # Colonnes détectées (indices)
         self.col_designation = None
         self.col_unite = None
@@ -226,7 +268,7 @@ class ExcelParser:
         
         # Si aucun lot trouvé dans le contenu, essayer depuis le nom de fichier
         if not lots:
-            filename_lot = self.extract_lot_fromFilename()
+            filename_lot = self.extract_lot_from_filename()
             if filename_lot:
                 lots.append(filename_lot)
         
@@ -491,6 +533,36 @@ class ExcelParser:
             # Si la conversion échoue, on retourne 0            print(f"⚠️ Impossible de convertir en nombre: '{value}'")
             return 0.0
     
+    def _convert_column(self, col: Optional[int]) -> np.ndarray:
+        """
+        Convertit une colonne entière en float (0.0 pour les cellules vides ou invalides)
+        
+        Args:
+            col: Indice de la colonne (None si non détectée)
+            
+        Returns:
+            Tableau de float aligné sur les lignes du DataFrame
+        """
+        if col is None or col >= len(self.df.columns):
+            return np.zeros(len(self.df), dtype=np.float64)
+        
+        series = self.df.iloc[:, col]
+        values = pd.to_numeric(series, errors='coerce')
+        
+        # Seules les cellules non numériques (ex: "1 234,56 €") passent par la conversion scalaire
+        needs_parsing = values.isna() & series.notna()
+        if needs_parsing.any():
+            values = values.astype(np.float64)
+            values[needs_parsing] = series[needs_parsing].map(self.safe_convert_to_float)
+        
+        return values.fillna(0.0).to_numpy(dtype=np.float64)
+    
+    def safe_convert_columns(self):
+        """Précalcule en une fois les colonnes quantité, prix unitaire et prix total converties en float"""
+        self._qte = self._convert_column(self.col_quantite)
+        self._pu = self._convert_column(self.col_prix_unitaire)
+        self._pt = self._convert_column(self.col_prix_total)
+    
     def _try_to_detect_numeric_columns(self):
         """
         Essaie de détecter automatiquement les colonnes numériques qui n'ont pas été trouvées
@@ -558,6 +630,39 @@ class ExcelParser:
                 self.col_prix_total = sorted_cols[0]
                 print(f"Détection auto: prix total = colonne {self.col_prix_total}")
     
+    def _column_notna(self, col: Optional[int]) -> np.ndarray:
+        """Masque des cellules renseignées d'une colonne (tout à False si la colonne est absente)"""
+        if col is None or col >= len(self.df.columns):
+            return np.zeros(len(self.df), dtype=bool)
+        return self.df.iloc[:, col].notna().to_numpy()
+    
+    def classify_dataframe(self, start_row: int = 0) -> pd.Series:
+        """
+        Classe toutes les lignes du DataFrame en une passe vectorisée
+        
+        Args:
+            start_row: Première ligne à classer (ligne suivant l'en-tête)
+            
+        Returns:
+            Série 'section' / 'element' / 'skip' indexée par numéro de ligne
+        """
+        designation = self.df.iloc[:, self.col_designation]
+        text = designation.astype(str).str.strip()
+        
+        is_section = (text.str.match(SECTION_NUMBER_PATTERN.pattern) |
+                      ((text.str.len() > 3) & text.str.match(SECTION_TITLE_PATTERN.pattern))).to_numpy()
+        
+        # Mêmes critères que la détection ligne à ligne : prix, indicateur d'unité ou texte long
+        has_price = (self._column_notna(self.col_prix_total) |
+                     (self._column_notna(self.col_prix_unitaire) & self._column_notna(self.col_quantite)))
+        has_unit_indicator = text.str.lower().str.contains(ELEMENT_UNIT_PATTERN).to_numpy()
+        is_element = has_price | has_unit_indicator | (text.str.len() > 30).to_numpy()
+        
+        skip = self.df.isna().all(axis=1).to_numpy() | designation.isna().to_numpy()
+        line_types = np.select([skip, is_section, is_element], ['skip', 'section', 'element'], default='skip')
+        
+        return pd.Series(line_types, index=self.df.index).iloc[start_row:]
+    
     def detect_sections_and_elements(self, header_row: Optional[int] = None) -> List[Dict]:
         """
         Détecte les sections et éléments d'ouvrage à partir de la ligne d'en-tête.
@@ -591,26 +696,24 @@ class ExcelParser:
         print(f"Colonnes utilisées: désignation={self.col_designation}, unité={self.col_unite}, "
               f"quantité={self.col_quantite}, prix unitaire={self.col_prix_unitaire}, prix total={self.col_prix_total}")
         
-        section_pattern = re.compile(r'^(\d+(?:\.\d+)*)\s+(.*)')
-        title_pattern = re.compile(r'^([A-Z][A-Z\s\d\.]+)$')  # Pour les titres en majuscules sans numéro
+        # Conversion numérique des colonnes de prix/quantité en une passe
+        self.safe_convert_columns()
+        
         current_section = None
         
         # Si header_row est None (pas trouvé), commencer depuis le début
         start_row = header_row + 1 if header_row is not None else 0
         
-        for i in range(start_row, len(self.df)):
+        # Classement vectorisé de toutes les lignes, puis parcours des seules lignes utiles
+        line_types = self.classify_dataframe(start_row)
+        
+        for i, line_type in line_types[line_types != 'skip'].items():
             row = self.df.iloc[i]
+            cell_text = str(row.iloc[self.col_designation]).strip()
             
-            # Ignorer les lignes vides
-            if all(pd.isna(val) for val in row.values):
-                continue
-            
-            # Vérifier si c'est une section (texte en début de ligne avec numéro ou en majuscules)
-            if pd.notna(row.iloc[self.col_designation]):
-                cell_text = str(row.iloc[self.col_designation]).strip()
-                
-                # Essayer de détecter une section avec numéro (ex: "1.2 Section Title")
-                match = section_pattern.match(cell_text)
+            if line_type == 'section':
+                # Section avec numéro (ex: "1.2 Section Title")
+                match = SECTION_NUMBER_PATTERN.match(cell_text)
                 
                 if match:
                     numero_section = match.group(1).strip()
@@ -625,100 +728,68 @@ class ExcelParser:
                         'titre_section': titre_section,
                         'niveau_hierarchique': niveau
                     }
-                    
-                    results.append({
-                        'type': 'section',
-                        'data': current_section,
-                        'row': i
-                    })
-                    continue
-                
-                # Deuxième test: est-ce un titre en majuscules sans numéro?
-                if len(cell_text) > 3 and title_pattern.match(cell_text):
-                    # C'est probablement un titre de section en majuscules
+                else:
+                    # Titre de section en majuscules sans numéro
                     titre_section = cell_text
                     
                     # Générer un numéro pour cette section, mais qu'on puisse tracer à l'original
                     # (contrairement au hash du script original)
                     numero_section = titre_section  # Utiliser le titre comme numéro
                     
-                    # Stocker la section
                     current_section = {
                         'numero_section': numero_section if len(numero_section) <= 50 else numero_section[:47] + "...",
                         'titre_section': titre_section,
                         'niveau_hierarchique': 1  # Section de premier niveau par défaut
                     }
-                    
-                    results.append({
-                        'type': 'section',
-                        'data': current_section,
-                        'row': i
-                    })
-                    continue
                 
-                # Si on a une section active, et qu'il y a des données de prix et quantité, c'est un élément
-                if current_section is not None or len(results) > 0:  # S'assurer qu'on a au moins une section existante
-                    has_price_data = False
-                    if self.col_prix_total is not None and self.col_prix_total < len(row) and pd.notna(row.iloc[self.col_prix_total]):
-                        has_price_data = True
-                    elif self.col_prix_unitaire is not None and self.col_quantite is not None:
-                        if (self.col_prix_unitaire < len(row) and pd.notna(row.iloc[self.col_prix_unitaire]) and 
-                            self.col_quantite < len(row) and pd.notna(row.iloc[self.col_quantite])):
-                            has_price_data = True
-                    
-                    # Vérifier également si le texte ressemble à un élément sans prix
-                    element_indicators = ['m2', 'm²', 'ml', 'u', 'ens', 'ensemble', 'unité', 'unite', 'forfait', 'ft']
-                    has_unit_indicator = any(indicator in cell_text.lower() for indicator in element_indicators)
-                    
-                    if has_price_data or has_unit_indicator or len(cell_text) > 30:
-                        # C'est un élément
-                        designation = cell_text
-                        
-                        # Récupérer l'unité si disponible
-                        unite = ""
-                        if self.col_unite is not None and self.col_unite < len(row) and pd.notna(row.iloc[self.col_unite]):
-                            unite = str(row.iloc[self.col_unite])
-                        
-                        # Récupérer quantité et prix avec conversion sécurisée
-                        quantite = 0.0
-                        if self.col_quantite is not None and self.col_quantite < len(row) and pd.notna(row.iloc[self.col_quantite]):
-                            quantite = self.safe_convert_to_float(row.iloc[self.col_quantite])
-                        
-                        prix_unitaire = 0.0
-                        if self.col_prix_unitaire is not None and self.col_prix_unitaire < len(row) and pd.notna(row.iloc[self.col_prix_unitaire]):
-                            prix_unitaire = self.safe_convert_to_float(row.iloc[self.col_prix_unitaire])
-                        
-                        prix_total = 0.0
-                        if self.col_prix_total is not None and self.col_prix_total < len(row) and pd.notna(row.iloc[self.col_prix_total]):
-                            prix_total = self.safe_convert_to_float(row.iloc[self.col_prix_total])
-                        elif quantite > 0 and prix_unitaire > 0:
-                            # Calculer le prix total si non disponible
-                            prix_total = quantite * prix_unitaire
-                        
-                        # Si prix total est disponible mais pas prix unitaire ou quantité, essayer de calculer
-                        if prix_total > 0:
-                            if prix_unitaire == 0 and quantite > 0:
-                                prix_unitaire = prix_total / quantite
-                            elif quantite == 0 and prix_unitaire > 0:
-                                quantite = prix_total / prix_unitaire
-                        
-                        results.append({
-                            'type': 'element',
-                            'data': {
-                                'designation_exacte': designation,
-                                'unite': unite[:10],  # Limiter à 10 caractères
-                                'quantite': quantite,
-                                'prix_unitaire_ht': prix_unitaire,
-                                'prix_total_ht': prix_total,                            },
-                            'row': i
-                        })
+                results.append({
+                    'type': 'section',
+                    'data': current_section,
+                    'row': i
+                })
+                continue
+            
+            # Élément uniquement si au moins une section existe déjà
+            if current_section is not None or len(results) > 0:
+                # C'est un élément
+                designation = cell_text
+                
+                # Récupérer l'unité si disponible
+                unite = ""
+                if self.col_unite is not None and self.col_unite < len(row) and pd.notna(row.iloc[self.col_unite]):
+                    unite = str(row.iloc[self.col_unite])
+                
+                # Quantité et prix déjà convertis par safe_convert_columns (0.0 si vide)
+                quantite = float(self._qte[i])
+                prix_unitaire = float(self._pu[i])
+                
+                prix_total = 0.0
+                if self.col_prix_total is not None and self.col_prix_total < len(row) and pd.notna(row.iloc[self.col_prix_total]):
+                    prix_total = float(self._pt[i])
+                elif quantite > 0 and prix_unitaire > 0:
+                    # Calculer le prix total si non disponible
+                    prix_total = quantite * prix_unitaire
+                
+                # Si prix total est disponible mais pas prix unitaire ou quantité, essayer de calculer
+                if prix_total > 0:
+                    if prix_unitaire == 0 and quantite > 0:
+                        prix_unitaire = prix_total / quantite
+                    elif quantite == 0 and prix_unitaire > 0:
+                        quantite = prix_total / prix_unitaire
+                
+                results.append({
+                    'type': 'element',
+                    'data': {
+                        'designation_exacte': designation,
+                        'unite': unite[:10],  # Limiter à 10 caractères
+                        'quantite': quantite,
+                        'prix_unitaire_ht': prix_unitaire,
+                        'prix_total_ht': prix_total,                            },
+                    'row': i
+                })
         
         print(f"Total éléments/sections détectés: {len(results)}")
         return results
-
-
-class ExcelParser:
-    # ... (classe existante)
     
     def _has_numeric_data(self, row):
         """
@@ -756,19 +827,10 @@ class ExcelParser:
     
     def _is_section_pattern(self, text: str) -> bool:
         """Vérifie si le texte correspond à un pattern de section"""
-        # Patterns pour les sections (similaires au script de production)
-        section_patterns = [
-            r'^(\d+(?:\.\d+)*)\s+(.+)',  # Format numéroté (ex: "1.2 Section Title")
-            r'^([A-Z][A-Z0-9\s\.\-\_]{3,})$',  # Titre en majuscules long
-            r'^(CHAPITRE\s+[A-Z0-9]+|LOT\s+[A-Z0-9]+)[\s\:]+(.+)',  # Chapitre/Lot
-            r'^(SOUS[\-\s]TOTAL|TOTAL)[\s\:]*(.*)',  # Totaux et sous-totaux
-            r'^([A-Z]{3,}[\s\-]*)+$',  # Plusieurs mots en majuscules
-        ]
-        for pattern in section_patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
+        if text.strip().upper() in self._TOTAL_KEYWORDS:
+            return True
         
-        return False
+        return any(pattern.match(text) for pattern in self._SECTION_PATTERNS)
         
     def _extract_section_data(self, text: str) -> Dict:
         """
@@ -777,28 +839,18 @@ class ExcelParser:
         Suit strictement la logique du script de production
         """
         # Pattern principal : numéro + titre (format le plus courant: "2.1 Escaliers métalliques")
-        num_title_match = re.match(r'^(\d+(?:\.\d+)*)\s+(.+)', text.strip())
+        num_title_match = self._NUM_RE.match(text.strip())
         if num_title_match:
             numero_section = num_title_match.group(1).strip()  # Ex: "2.1"
             titre_section = num_title_match.group(2).strip()   # Ex: "Escaliers métalliques"
         else:
-            # Patterns spéciaux avec numérotation claire
-            special_patterns = [
-                # CHAPITRE 2: Menuiseries → numero="CHAPITRE 2", titre="Menuiseries"
-                (r'^(CHAPITRE\s+[A-Z0-9]+)[\s\:]+(.+)', lambda m: (m.group(1), m.group(2))),
-                # LOT 06 - MÉTALLERIE → numero="LOT 06", titre="MÉTALLERIE"
-                (r'^(LOT\s+[A-Z0-9]+)[\s\:]+(.+)', lambda m: (m.group(1), m.group(2))),
-                # SOUS-TOTAL Escaliers → numero="SOUS-TOTAL", titre="Escaliers"
-                (r'^(SOUS[\-\s]TOTAL|TOTAL)[\s\:]*(.*)', lambda m: (m.group(1), m.group(2) if m.group(2) else m.group(1))),
-            ]
-            
             # Initialiser avec des valeurs par défaut
             numero_section = ""
             titre_section = text.strip()
             
             # Essayer les patterns spéciaux
-            for pattern, extractor in special_patterns:
-                match = re.match(pattern, text, re.IGNORECASE)
+            for pattern, extractor in self._SPECIAL_SECTION_PATTERNS:
+                match = pattern.match(text)
                 if match:
                     numero_section, titre_section = extractor(match)
                     break
@@ -806,7 +858,7 @@ class ExcelParser:
             if not numero_section:
                 # Pour les sections en majuscules comme "FERRURES"
                 # On crée un numéro unique mais on garde le titre séparé
-                if titre_section.isupper() or re.match(r'^[A-Z][A-Z0-9\.\s\-\_]{3,}$', titre_section):
+                if titre_section.isupper() or self._UPPER_TITLE_RE.match(titre_section):
                     numero_section = titre_section
                 else:
                     # Utiliser un identifiant générique pour les autres cas
@@ -841,7 +893,8 @@ class ExcelParser:
             numero_section = numero_section[:47] + "..."
         
         # Calculer le niveau hiérarchique basé sur le numéro (si c'est un format numérique comme 2.1.3)
-        if numero_section and re.match(r'^\d+(\.\d+)*$', numero_section):            niveau = numero_section.count('.') + 1
+        if numero_section and self._SECTION_NUMBER_RE.fullmatch(numero_section):
+            niveau = numero_section.count('.') + 1
         else:
             niveau = 1
             
@@ -850,8 +903,8 @@ class ExcelParser:
             'titre_section': titre_section,
             'niveau_hierarchique': niveau
         }
-    
-def _extract_element_data(self, row, designation_text: str) -> Dict:
+
+    def _extract_element_data(self, row, designation_text: str) -> Dict:
         """
         Extrait les données d'un élément d'ouvrage
         Sépare le numéro de la designation_exacte
@@ -917,6 +970,23 @@ def _extract_element_data(self, row, designation_text: str) -> Dict:
         return element_data
 
 
+@lru_cache(maxsize=4)
+def get_gemini_processor(gemini_key: str, chunk_size: int = 20) -> GeminiProcessor:
+    """
+    Retourne le processeur Gemini partagé pour une clé donnée (client et cache
+    initialisés une seule fois). Une initialisation en échec lève une exception
+    et n'est donc pas mise en cache : elle sera retentée au prochain appel.
+    
+    Args:
+        gemini_key: Clé API Gemini
+        chunk_size: Taille des lots envoyés à Gemini
+        
+    Returns:
+        Instance de GeminiProcessor
+    """
+    return GeminiProcessor(gemini_key, chunk_size)
+
+
 class DPGFImportService:
     """Service d'import de DPGF intégré à l'API"""
     
@@ -931,12 +1001,16 @@ class DPGFImportService:
         self.gemini = None
         if self.use_gemini:
             try:
-                self.gemini = GeminiProcessor(gemini_key, chunk_size)
+                self.gemini = get_gemini_processor(gemini_key, chunk_size)
                 print("✅ Processeur Gemini initialisé")
             except Exception as e:
                 print(f"⚠️ Impossible d'initialiser le processeur Gemini: {e}")
                 self.use_gemini = False
     
+    def reset_stats(self):
+        """Remet à zéro les statistiques avant l'import d'un nouveau fichier"""
+        self.stats = ImportStats()
+    
     def get_or_create_client(self, db: Session, client_name: str) -> int:
         """
         Récupère ou crée un client dans la base de données
@@ -1144,33 +1218,35 @@ class DPGFImportService:
                 prix_total_ht=prix_total,
                 offre_acceptee=False
             )
-            new_element = element_crud.create_element_ouvrage(db, element_create)
+            new_element = element_crud.create_element(db, element_create)
             print(f"➕ Nouvel élément créé: {designation[:30]}..." if len(designation) > 30 else designation)
             self.stats.elements_created += 1
-            return new_element.id_element_ouvrage
+            return new_element.id_element
             
         except Exception as e:
             print(f"❌ Erreur création élément: {e}")
             self.stats.errors += 1
             raise
     
-    def import_file(self, db: Session, file_path: str, client_name: Optional[str] = None):
+    def import_file(self, db: Session, file_path: str, client_name: Optional[str] = None,
+                    file_obj: Optional[BinaryIO] = None):
         """
         Importe un fichier DPGF dans la base de données
         
         Args:
             db: Session de base de données
-            file_path: Chemin du fichier Excel
+            file_path: Chemin du fichier Excel (ou nom du fichier si file_obj est fourni)
             client_name: Nom du client (optionnel, détecté automatiquement si non fourni)
+            file_obj: Contenu du fichier en mémoire (optionnel, évite l'écriture sur disque)
             
         Returns:
             ID du DPGF importé
         """
         print(f"🔄 Import du fichier {file_path}")
-        self.stats = ImportStats()  # Réinitialiser les stats
+        self.reset_stats()
         
         # 1. Parser le fichier Excel
-        parser = ExcelParser(file_path)
+        parser = ExcelParser(file_path, file_obj)
         
         # 2. Détecter ou utiliser le client
         if not client_name:
@@ -1313,3 +1389,18 @@ class DPGFImportService:
             import traceback
             traceback.print_exc()
             return results
+
+
+def get_import_service(gemini_key: Optional[str] = None, use_gemini: bool = False) -> DPGFImportService:
+    """
+    Retourne un nouveau service d'import (statistiques propres à la requête).
+    Seul le processeur Gemini est partagé, via get_gemini_processor.
+    
+    Args:
+        gemini_key: Clé API Gemini (optionnelle)
+        use_gemini: Activer la classification par Gemini
+        
+    Returns:
+        Instance de DPGFImportService
+    """
+    return DPGFImportService(gemini_key=gemini_key, use_gemini=use_gemini)
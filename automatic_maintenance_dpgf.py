@@ -618,9 +618,17 @@ class AutomaticMaintenance:
             "scripts/identify_relevant_files_sharepoint.py"
         ]
         
+        # Un seul listage par répertoire parent au lieu d'un stat() par fichier
+        dir_entries = {}
+        for parent in {Path(file_path).parent for file_path in critical_files}:
+            try:
+                dir_entries[parent] = set(os.listdir(parent))
+            except OSError:
+                dir_entries[parent] = set()
+        
         for file_path in critical_files:
             path = Path(file_path)
-            if path.exists():
+            if path.name in dir_entries[path.parent]:
                 try:
                     # Vérifier que le fichier peut être lu
                     with open(path, 'r', encoding='utf-8') as f:
@@ -4,14 +4,19 @@ Ce script propose des optimisations concrètes basées sur l'analyse des perform
 """
 
 import os
+import re
 import sys
 import time
+import random
 import argparse
 import subprocess
+import threading
 import json
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import requests
 import logging
 
 # Configuration du logging
@@ -26,6 +31,183 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Nombre maximal de lignes conservées par flux (mémoire bornée quel que soit le volume de sortie)
+MAX_OUTPUT_LINES = 10_000
+
+# Attente maximale de la fin des threads de lecture après l'arrêt du processus (secondes) :
+# un sous-processus petit-enfant peut garder les pipes ouverts après kill()
+READER_JOIN_TIMEOUT = 5
+
+# Pause maximale entre deux tentatives (secondes)
+MAX_RETRY_DELAY = 60
+
+# Limitation SharePoint/Graph signalée dans la sortie du script d'import
+RETRY_AFTER_PATTERN = re.compile(r'Retry-After:\s*(\d+)', re.IGNORECASE)
+
+# Lignes lues par feuille pour savoir si elle contient des données (analyse de complexité)
+SHEET_PEEK_ROWS = 10
+
+# Nombre de classeurs dont les dimensions restent en cache (nouvelles tentatives sur les mêmes fichiers)
+SHEET_PROBE_CACHE_SIZE = 64
+
+
+def compute_retry_delay(attempt: int, output: str = "") -> float:
+    """
+    Calcule la pause avant la tentative suivante.
+    Respecte un "Retry-After: <n>" présent dans la sortie (erreur 429), sinon
+    backoff exponentiel avec jitter pour ne pas relancer en même temps que les autres imports.
+    
+    Args:
+        attempt: Numéro de la tentative qui vient d'échouer (à partir de 1)
+        output: Sortie de la tentative (stderr/stdout)
+        
+    Returns:
+        Pause en secondes
+    """
+    match = RETRY_AFTER_PATTERN.search(output or "")
+    if match:
+        return min(MAX_RETRY_DELAY, int(match.group(1)))
+    return min(MAX_RETRY_DELAY, (2 ** attempt) + random.random())
+
+
+def run_streaming(cmd: List[str], timeout: int, cwd=None, env=None,
+                  max_lines: int = MAX_OUTPUT_LINES) -> subprocess.CompletedProcess:
+    """
+    Exécute une commande en lisant stdout/stderr au fil de l'eau.
+    Chaque flux est vidé par un thread dédié dans un deque borné, ce qui évite
+    le blocage sur un tampon de pipe plein et garde une mémoire constante.
+    Les lignes sont relayées en temps réel dans le log (niveau DEBUG).
+    
+    Args:
+        cmd: Commande à exécuter
+        timeout: Délai maximal en secondes
+        cwd: Répertoire de travail
+        env: Variables d'environnement
+        max_lines: Nombre de lignes conservées par flux
+        
+    Returns:
+        CompletedProcess avec les dernières lignes de stdout/stderr
+        
+    Raises:
+        subprocess.TimeoutExpired: si la commande dépasse le délai (le processus est tué)
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        cwd=cwd,
+        env=env
+    )
+    buffers = {'stdout': deque(maxlen=max_lines), 'stderr': deque(maxlen=max_lines)}
+    
+    def drain(stream, name):
+        for line in stream:
+            buffers[name].append(line)
+            logger.debug(f"      [{name}] {line.rstrip()}")
+        stream.close()
+    
+    readers = [
+        threading.Thread(target=drain, args=(process.stdout, 'stdout'), daemon=True),
+        threading.Thread(target=drain, args=(process.stderr, 'stderr'), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+    
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join(timeout=READER_JOIN_TIMEOUT)
+    
+    return subprocess.CompletedProcess(
+        cmd, process.returncode, ''.join(buffers['stdout']), ''.join(buffers['stderr'])
+    )
+
+
+def list_excel_files(directory: Path) -> List[str]:
+    """
+    Liste les fichiers Excel (.xlsx/.xls) d'un répertoire en un seul parcours
+    
+    Args:
+        directory: Répertoire à parcourir
+        
+    Returns:
+        Chemins des fichiers Excel, triés par nom
+    """
+    with os.scandir(directory) as entries:
+        return sorted(
+            entry.path for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(('.xlsx', '.xls'))
+        )
+
+
+@lru_cache(maxsize=SHEET_PROBE_CACHE_SIZE)
+def probe_sheet_dimensions(file_path: str, mtime_ns: int, size: int,
+                           max_sheets: int = 3) -> Tuple[int, Tuple[Optional[Tuple[int, int]], ...]]:
+    """
+    Mesure les premières feuilles d'un classeur sans les charger entièrement
+    
+    Les fichiers .xlsx/.xlsm sont ouverts en lecture seule avec openpyxl : seules
+    SHEET_PEEK_ROWS lignes sont lues par feuille, la taille provient des dimensions
+    déclarées. Les autres formats (.xls) passent par pandas.
+    Le résultat est mis en cache : mtime_ns et size font partie de la clé, un fichier
+    modifié est donc relu (les nouvelles tentatives d'import ne relisent pas le classeur).
+    
+    Args:
+        file_path: Chemin du fichier Excel
+        mtime_ns: Date de modification du fichier (os.stat().st_mtime_ns)
+        size: Taille du fichier en octets
+        max_sheets: Nombre maximum de feuilles mesurées
+        
+    Returns:
+        Nombre total de feuilles et, par feuille mesurée, (lignes de données, colonnes)
+        ou None si la feuille n'a pas pu être lue. Les feuilles vides sont ignorées.
+    """
+    if Path(file_path).suffix.lower() in ('.xlsx', '.xlsm'):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            dimensions = []
+            for worksheet in workbook.worksheets[:max_sheets]:
+                try:
+                    peek = list(islice(worksheet.iter_rows(values_only=True), SHEET_PEEK_ROWS))
+                    # Même critère que pandas : au moins une ligne après l'en-tête
+                    if len(peek) < 2:
+                        continue
+                    if worksheet.max_row is None:
+                        # Dimensions non déclarées dans le fichier : les recalculer
+                        worksheet.reset_dimensions()
+                        worksheet.calculate_dimension(force=True)
+                    dimensions.append((worksheet.max_row - 1, worksheet.max_column))
+                except Exception:
+                    dimensions.append(None)
+            return len(workbook.sheetnames), tuple(dimensions)
+        finally:
+            workbook.close()
+
+    import pandas as pd
+
+    excel_file = pd.ExcelFile(file_path)
+    dimensions = []
+    for sheet in excel_file.sheet_names[:max_sheets]:
+        try:
+            df = pd.read_excel(excel_file, sheet_name=sheet, nrows=SHEET_PEEK_ROWS)
+            if len(df) > 0:
+                full_df = pd.read_excel(excel_file, sheet_name=sheet)
+                dimensions.append((len(full_df), len(full_df.columns)))
+        except Exception:
+            dimensions.append(None)
+    return len(excel_file.sheet_names), tuple(dimensions)
+
+
 class TimeoutOptimizer:
     """Gestionnaire d'optimisation des timeouts et retry logic"""
     
@@ -81,12 +263,8 @@ class TimeoutOptimizer:
             logger.info(f"   Tentative {attempt}/{self.max_retries} - Timeout: {timeout}s")
             
             try:
-                result = subprocess.run(
+                result = run_streaming(
                     import_cmd,
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
                     timeout=timeout,
                     cwd=Path(__file__).parent,
                     env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
@@ -116,7 +294,9 @@ class TimeoutOptimizer:
                         # Augmenter le timeout pour la prochaine tentative
                         timeout = int(timeout * 1.5)
                         logger.info(f"   ⏳ Augmentation du timeout à {timeout}s pour la prochaine tentative")
-                        time.sleep(5)  # Pause avant retry
+                        delay = compute_retry_delay(attempt, f"{result.stderr}\n{result.stdout}")
+                        logger.info(f"   ⏳ Pause de {delay:.1f}s avant retry")
+                        time.sleep(delay)
                         continue
             
             except subprocess.TimeoutExpired:
@@ -140,7 +320,7 @@ class TimeoutOptimizer:
                         timeout = int(timeout * 1.5)  # Augmentation modérée
                     
                     logger.info(f"   ⏳ Retry avec timeout étendu: {timeout}s")
-                    time.sleep(10)  # Pause plus longue après timeout
+                    time.sleep(compute_retry_delay(attempt))
                     continue
             
             except Exception as e:
@@ -179,35 +359,27 @@ class ImportOptimizer:
             Score de complexité (1.0 = normal, 2.0+ = complexe)
         """
         try:
-            import pandas as pd
-            
-            # Analyser la structure du fichier
-            excel_file = pd.ExcelFile(file_path)
-            sheet_count = len(excel_file.sheet_names)
-            
             complexity_score = 1.0
             
+            sheet_count, sheet_dimensions = self._peek_sheet_dimensions(file_path, max_sheets=3)
+            
             # Facteurs de complexité
             if sheet_count > 5:
                 complexity_score += 0.3  # Nombreuses feuilles
             
-            # Analyser la taille des données dans chaque feuille
+            # Analyser la taille des données dans chaque feuille (max 3 feuilles)
             total_cells = 0
-            for sheet in excel_file.sheet_names[:3]:  # Analyser max 3 feuilles
-                try:
-                    df = pd.read_excel(file_path, sheet_name=sheet, nrows=10)
-                    if len(df) > 0:
-                        # Estimer la taille totale
-                        full_df = pd.read_excel(file_path, sheet_name=sheet)
-                        cells_in_sheet = len(full_df) * len(full_df.columns)
-                        total_cells += cells_in_sheet
-                        
-                        if len(full_df) > 1000:  # Beaucoup de lignes
-                            complexity_score += 0.2
-                        if len(full_df.columns) > 20:  # Beaucoup de colonnes
-                            complexity_score += 0.2
-                except:
+            for dimensions in sheet_dimensions:
+                if dimensions is None:
                     complexity_score += 0.1  # Feuille problématique
+                    continue
+                rows, cols = dimensions
+                total_cells += rows * cols
+                
+                if rows > 1000:  # Beaucoup de lignes
+                    complexity_score += 0.2
+                if cols > 20:  # Beaucoup de colonnes
+                    complexity_score += 0.2
             
             # Facteur basé sur le nombre total de cellules
             if total_cells > 50000:
@@ -227,6 +399,11 @@ class ImportOptimizer:
             logger.warning(f"Erreur analyse complexité {file_path}: {e}")
             return 1.5  # Score de sécurité en cas d'erreur
     
+    def _peek_sheet_dimensions(self, file_path: str, max_sheets: int = 3) -> Tuple[int, Tuple[Optional[Tuple[int, int]], ...]]:
+        """Mesure les premières feuilles d'un classeur (voir probe_sheet_dimensions, résultat en cache)"""
+        stat = os.stat(file_path)
+        return probe_sheet_dimensions(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, max_sheets)
+    
     def optimize_import_batch(self, file_list: List[str], output_dir: str = "optimized_imports") -> Dict:
         """
         Optimise l'import d'un batch de fichiers avec gestion intelligente des timeouts
@@ -383,14 +560,12 @@ def main():
         test_files = args.test_files
     elif args.test_dir:
         test_dir = Path(args.test_dir)
-        test_files = list(test_dir.glob("*.xlsx")) + list(test_dir.glob("*.xls"))
-        test_files = [str(f) for f in test_files]
+        test_files = list_excel_files(test_dir)
     else:
         # Utiliser les fichiers de test par défaut
         test_dir = Path("test_data")
         if test_dir.exists():
-            test_files = list(test_dir.glob("*.xlsx")) + list(test_dir.glob("*.xls"))
-            test_files = [str(f) for f in test_files[:3]]  # Limiter à 3 pour les tests
+            test_files = list_excel_files(test_dir)[:3]  # Limiter à 3 pour les tests
         else:
             logger.error("Aucun fichier de test trouvé. Spécifiez --test-files ou --test-dir")
             return
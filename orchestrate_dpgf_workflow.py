@@ -22,6 +22,7 @@ import sys
 import json
 import time
 import argparse
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -30,6 +31,7 @@ import tempfile
 import shutil
 import subprocess
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration de l'encodage pour Windows
 if sys.platform.startswith('win'):
@@ -46,7 +48,7 @@ if scripts_dir.exists():
 
 try:
     from identify_relevant_files_sharepoint import (
-        FileIdentifier, SharePointClient, detect_document_type_from_filename,
+        FileIdentifier, SharePointClient, get_client, detect_document_type_from_filename,
         scan_excel_content, EXCEL_EXTENSIONS, setup_logging
     )
 except ImportError as e:
@@ -61,6 +63,40 @@ DEFAULT_MIN_CONFIDENCE = 0.3
 DEFAULT_BATCH_SIZE = 5  # Nombre de dossiers traités en parallèle
 DEFAULT_MAX_FILES_PER_FOLDER = 50  # Limite par dossier pour éviter les timeouts
 
+# Imports lancés simultanément pour un dossier. 1 par défaut : les scripts d'import créent
+# client, projet et lot sans verrou (recherche puis insertion), deux imports concurrents
+# peuvent donc créer des doublons. À augmenter (--max-concurrent-imports) uniquement
+# si les fichiers d'un dossier ne partagent ni client ni projet.
+DEFAULT_MAX_CONCURRENT_IMPORTS = 1
+IMPORT_TIMEOUT = 600  # 10 minutes par fichier
+
+def decode_output(data: bytes) -> str:
+    """Décode une portion de sortie de sous-processus (UTF-8, caractères invalides remplacés)"""
+    return data.decode('utf-8', errors='replace') if data else ''
+
+async def run_command_async(cmd: List[str], timeout: float, cwd: Path = None,
+                            env: Dict[str, str] = None) -> Tuple[Optional[int], bytes, bytes]:
+    """
+    Exécute une commande via asyncio avec un timeout
+    
+    Returns:
+        Tuple[returncode, stdout, stderr]: returncode vaut None si le timeout est atteint
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return None, b'', b''
+    return proc.returncode, stdout, stderr
+
 class FolderProcessor:
     """Classe pour traiter un dossier SharePoint individuellement"""
     
@@ -219,7 +255,8 @@ class WorkflowOrchestrator:
                  gemini_key: str = None,
                  use_gemini: bool = True,
                  chunk_size: int = 20,
-                 debug_import: bool = False):
+                 debug_import: bool = False,
+                 max_concurrent_imports: int = DEFAULT_MAX_CONCURRENT_IMPORTS):
         """
         Initialise l'orchestrateur
         
@@ -234,6 +271,7 @@ class WorkflowOrchestrator:
             use_gemini: Utiliser Gemini si clé disponible
             chunk_size: Taille des chunks pour Gemini
             debug_import: Mode debug pour l'import
+            max_concurrent_imports: Imports simultanés par dossier (voir DEFAULT_MAX_CONCURRENT_IMPORTS)
         """
         self.min_confidence = min_confidence
         self.max_files_per_folder = max_files_per_folder
@@ -245,6 +283,7 @@ class WorkflowOrchestrator:
         self.use_gemini = use_gemini and gemini_key is not None
         self.chunk_size = chunk_size
         self.debug_import = debug_import
+        self.max_concurrent_imports = max(1, max_concurrent_imports)
         
         self.logger = logging.getLogger(__name__)
         self.sharepoint_client = None
@@ -269,7 +308,7 @@ class WorkflowOrchestrator:
     def initialize(self):
         """Initialise les composants nécessaires"""
         if not self.sharepoint_client:
-            self.sharepoint_client = SharePointClient()
+            self.sharepoint_client = get_client()
             
         if not self.folder_processor:
             self.folder_processor = FolderProcessor(
@@ -330,7 +369,7 @@ class WorkflowOrchestrator:
     
     def process_folders_batch(self, folders: List[Dict]) -> List[Dict]:
         """
-        Traite un lot de dossiers
+        Traite un lot de dossiers en parallèle (un thread par dossier)
         
         Args:
             folders: Liste des dossiers à traiter
@@ -339,48 +378,56 @@ class WorkflowOrchestrator:
             List[Dict]: Résultats du traitement
         """
         batch_results = []
-        
-        for folder in folders:
-            try:
-                result = self.folder_processor.process_folder(
-                    folder['full_path'], 
-                    folder['name']
-                )
-                batch_results.append(result)
-                
-                # Mettre à jour les statistiques
-                self.stats['folders_processed'] += 1
-                self.stats['total_files_found'] += result['files_found']
-                self.stats['total_excel_files'] += result['excel_files']
-                self.stats['total_identified_files'] += len(result['identified_files'])
-                
-                if result['identified_files']:
-                    self.stats['folders_with_files'] += 1
-                
-                # Import automatique si configuré et des fichiers identifiés
-                if self.auto_import and result['identified_files']:
-                    import_result = self.import_files_from_result(result)
-                    result['import_result'] = import_result
-                    if import_result.get('success', False):
-                        self.stats['total_imported_files'] += import_result.get('imported_count', 0)
-                
-            except Exception as e:
-                error_msg = f"Erreur lors du traitement du dossier {folder['name']}: {str(e)}"
-                self.logger.error(error_msg)
-                self.stats['errors'].append(error_msg)
-                
-                # Créer un résultat d'erreur
-                error_result = {
-                    'folder_path': folder['full_path'],
-                    'folder_name': folder['name'],
-                    'status': 'error',
-                    'errors': [error_msg],
-                    'files_found': 0,
-                    'excel_files': 0,
-                    'identified_files': [],
-                    'processing_time': 0
-                }
-                batch_results.append(error_result)
+        if not folders:
+            return batch_results
+        
+        # Les listages SharePoint de tous les dossiers partagent LISTING_SEMAPHORE (plafond global
+        # de requêtes simultanées), quel que soit le nombre de dossiers traités en parallèle
+        with ThreadPoolExecutor(max_workers=len(folders)) as executor:
+            futures = [
+                executor.submit(self.folder_processor.process_folder, folder['full_path'], folder['name'])
+                for folder in folders
+            ]
+            
+            # Les statistiques et l'import restent dans le thread principal, dans l'ordre des dossiers
+            for folder, future in zip(folders, futures):
+                try:
+                    result = future.result()
+                    batch_results.append(result)
+                    
+                    # Mettre à jour les statistiques
+                    self.stats['folders_processed'] += 1
+                    self.stats['total_files_found'] += result['files_found']
+                    self.stats['total_excel_files'] += result['excel_files']
+                    self.stats['total_identified_files'] += len(result['identified_files'])
+                    
+                    if result['identified_files']:
+                        self.stats['folders_with_files'] += 1
+                    
+                    # Import automatique si configuré et des fichiers identifiés
+                    if self.auto_import and result['identified_files']:
+                        import_result = self.import_files_from_result(result)
+                        result['import_result'] = import_result
+                        if import_result.get('success', False):
+                            self.stats['total_imported_files'] += import_result.get('imported_count', 0)
+                    
+                except Exception as e:
+                    error_msg = f"Erreur lors du traitement du dossier {folder['name']}: {str(e)}"
+                    self.logger.error(error_msg)
+                    self.stats['errors'].append(error_msg)
+                    
+                    # Créer un résultat d'erreur
+                    error_result = {
+                        'folder_path': folder['full_path'],
+                        'folder_name': folder['name'],
+                        'status': 'error',
+                        'errors': [error_msg],
+                        'files_found': 0,
+                        'excel_files': 0,
+                        'identified_files': [],
+                        'processing_time': 0
+                    }
+                    batch_results.append(error_result)
         
         return batch_results
     
@@ -409,10 +456,9 @@ class WorkflowOrchestrator:
                 "../scripts/import_complete.py"
             ]
             
-            for path in possible_paths:
-                if Path(path).exists():
-                    import_script = str(Path(path).resolve())  # Résoudre le chemin absolu
-                    break
+            found = next((path for path in possible_paths if Path(path).exists()), None)
+            if found:
+                import_script = str(Path(found).resolve())  # Résoudre le chemin absolu
         
         if not import_script or not Path(import_script).exists():
             error_msg = "Script d'import non trouvé (import_complete.py recommandé ou import_dpgf_unified.py)"
@@ -478,6 +524,7 @@ class WorkflowOrchestrator:
             import_success_count = 0
             script_name = Path(import_script).name
             
+            import_jobs = []
             for file_info in downloaded_files:
                 file_path = file_info['temp_path']
                 original_name = file_info['original_name']
@@ -507,58 +554,69 @@ class WorkflowOrchestrator:
                 else:  # fallback pour import_dpgf_unified.py
                     cmd = [sys.executable, import_script, '--file', file_path]
                 
-                try:
-                    # Log de la commande en mode debug
-                    if self.debug_import:
-                        self.logger.debug(f"   🔧 Commande: {' '.join(cmd)}")
-                        self.logger.debug(f"   📁 Répertoire: {Path(__file__).parent}")
-                        self.logger.debug(f"   📄 Fichier: {original_name} -> {safe_name}")
-                    
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        encoding='utf-8',
-                        errors='replace',  # Remplacer les caractères non décodables
-                        timeout=600,  # 10 minutes par fichier
-                        cwd=Path(__file__).parent,  # Utiliser le répertoire de l'orchestrateur comme base
-                        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}  # S'assurer de l'encodage UTF-8
-                    )
+                # Log de la commande en mode debug
+                if self.debug_import:
+                    self.logger.debug(f"   🔧 Commande: {' '.join(cmd)}")
+                    self.logger.debug(f"   📁 Répertoire: {Path(__file__).parent}")
+                    self.logger.debug(f"   📄 Fichier: {original_name} -> {safe_name}")
+                
+                import_jobs.append((file_info, cmd))
+            
+            # Une seule boucle asyncio supervise tous les sous-processus d'import
+            outcomes = asyncio.run(self._run_import_commands([cmd for _, cmd in import_jobs]))
+            
+            for (file_info, cmd), outcome in zip(import_jobs, outcomes):
+                file_path = file_info['temp_path']
+                original_name = file_info['original_name']
+                
+                if isinstance(outcome, Exception):
+                    self.logger.warning(f"   💥 Erreur import: {Path(file_path).name} - {str(outcome)}")
+                    continue
+                
+                returncode, stdout, stderr = outcome
+                if returncode is None:
+                    self.logger.warning(f"   ⏰ Timeout import: {Path(file_path).name}")
+                    continue
+                
+                if returncode == 0:
+                    import_success_count += 1
+                    self.logger.info(f"   ✅ Import réussi: {original_name}")
                     
-                    if result.returncode == 0:
-                        import_success_count += 1
-                        self.logger.info(f"   ✅ Import réussi: {original_name}")
+                    # Log de la sortie en mode debug pour voir les détails
+                    if self.debug_import and stdout:
+                        output_lines = [decode_output(line) for line in stdout.strip().split(b'\n')[-10:]]  # Dernières lignes
+                        self.logger.debug(f"      Dernières lignes de sortie: {output_lines}")
                         
-                        # Log de la sortie en mode debug pour voir les détails
-                        if self.debug_import and result.stdout:
-                            output_lines = result.stdout.strip().split('\n')[-10:]  # Dernières lignes
-                            self.logger.debug(f"      Dernières lignes de sortie: {output_lines}")
-                            
-                    else:
-                        self.logger.warning(f"   ❌ Échec import: {original_name} (code {result.returncode})")
-                        if result.stderr:
-                            self.logger.warning(f"      Erreur stderr: {result.stderr[:500]}")
-                        if result.stdout:
-                            self.logger.warning(f"      Sortie stdout: {result.stdout[-500:]}")
+                else:
+                    self.logger.warning(f"   ❌ Échec import: {original_name} (code {returncode})")
+                    if stderr:
+                        self.logger.warning(f"      Erreur stderr: {decode_output(stderr[:500])}")
+                    if stdout:
+                        self.logger.warning(f"      Sortie stdout: {decode_output(stdout[-500:])}")
+                    
+                    # En mode debug, logger la commande exacte qui a échoué
+                    if self.debug_import:
+                        self.logger.debug(f"      Commande échouée: {' '.join(cmd)}")
+                        self.logger.debug(f"      Répertoire de travail: {Path(__file__).parent}")
+                        self.logger.debug(f"      Fichier source original: {original_name}")
+                        self.logger.debug(f"      Fichier temporaire: {file_path}")
                         
-                        # En mode debug, logger la commande exacte qui a échoué
-                        if self.debug_import:
-                            self.logger.debug(f"      Commande échouée: {' '.join(cmd)}")
-                            self.logger.debug(f"      Répertoire de travail: {Path(__file__).parent}")
-                            self.logger.debug(f"      Fichier source original: {original_name}")
-                            self.logger.debug(f"      Fichier temporaire: {file_path}")
-                            
-                            # Vérifier si le fichier temporaire existe et est lisible
-                            if os.path.exists(file_path):
-                                file_size = os.path.getsize(file_path)
-                                self.logger.debug(f"      Taille fichier temp: {file_size} bytes")
-                            else:
-                                self.logger.debug(f"      ⚠️ Fichier temporaire n'existe pas!")
-                            
-                except subprocess.TimeoutExpired:
-                    self.logger.warning(f"   ⏰ Timeout import: {Path(file_path).name}")
-                except Exception as e:
-                    self.logger.warning(f"   💥 Erreur import: {Path(file_path).name} - {str(e)}")
+                        # Vérifier si le fichier temporaire existe et est lisible :
+                        # un seul descripteur pour la taille (fstat) et l'en-tête (pread)
+                        try:
+                            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+                        except FileNotFoundError:
+                            self.logger.debug(f"      ⚠️ Fichier temporaire n'existe pas!")
+                        else:
+                            try:
+                                file_size = os.fstat(fd).st_size
+                                # os.pread n'existe pas sous Windows
+                                header = os.pread(fd, 8, 0) if hasattr(os, 'pread') else os.read(fd, 8)
+                            finally:
+                                os.close(fd)
+                            self.logger.debug(f"      Taille fichier temp: {file_size} bytes")
+                            # 504b0304 (PK) pour un .xlsx valide, d0cf11e0 pour un .xls
+                            self.logger.debug(f"      En-tête fichier temp: {header.hex()}")
             
             if import_success_count > 0:
                 self.logger.info(f"✅ Import terminé: {import_success_count}/{len(downloaded_files)} fichiers importés")
@@ -595,6 +653,26 @@ class WorkflowOrchestrator:
             except:
                 pass
     
+    async def _run_import_commands(self, commands: List[List[str]]) -> List:
+        """
+        Lance les commandes d'import depuis une même boucle asyncio
+        
+        Args:
+            commands: Liste des commandes à exécuter
+            
+        Returns:
+            List: Pour chaque commande, (returncode, stdout, stderr) ou l'exception levée
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_imports)
+        env = {**os.environ, 'PYTHONIOENCODING': 'utf-8'}  # S'assurer de l'encodage UTF-8
+        cwd = Path(__file__).parent  # Utiliser le répertoire de l'orchestrateur comme base
+        
+        async def run_one(cmd: List[str]):
+            async with semaphore:
+                return await run_command_async(cmd, IMPORT_TIMEOUT, cwd=cwd, env=env)
+        
+        return await asyncio.gather(*(run_one(cmd) for cmd in commands), return_exceptions=True)
+    
     def generate_progress_report(self, output_dir: str = "reports") -> str:
         """
         Génère un rapport de progression
@@ -716,8 +794,13 @@ class WorkflowOrchestrator:
             self.stats['errors'].append(f"Erreur fatale: {str(e)}")
             raise
 
-def main():
-    """Fonction principale"""
+def main(argv: Optional[List[str]] = None):
+    """
+    Fonction principale
+    
+    Args:
+        argv: Arguments de la ligne de commande (sys.argv[1:] si None)
+    """
     parser = argparse.ArgumentParser(
         description="Orchestrateur optimisé pour le workflow d'identification et d'import DPGF/BPU/DQE",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -770,6 +853,9 @@ Exemples d'utilisation:
                        help='Import automatique des fichiers identifiés')
     parser.add_argument('--import-script', type=str,
                        help='Chemin vers le script d\'import (auto-détecté si omis)')
+    parser.add_argument('--max-concurrent-imports', type=int, default=DEFAULT_MAX_CONCURRENT_IMPORTS,
+                       help=f'Imports simultanés par dossier (défaut: {DEFAULT_MAX_CONCURRENT_IMPORTS}). '
+                            'Au-delà de 1, des imports concurrents peuvent créer des clients/projets en double')
     
     # Configuration Gemini pour import de haute qualité
     parser.add_argument('--gemini-key', type=str,
@@ -791,7 +877,7 @@ Exemples d'utilisation:
     parser.add_argument('--test-mode', action='store_true',
                        help='Mode test: limite automatiquement à 3 dossiers et 5 fichiers par dossier')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Appliquer les limitations du mode test
     if args.test_mode:
@@ -843,7 +929,8 @@ Exemples d'utilisation:
             gemini_key=args.gemini_key,
             use_gemini=use_gemini,
             chunk_size=args.chunk_size,
-            debug_import=args.debug_import
+            debug_import=args.debug_import,
+            max_concurrent_imports=args.max_concurrent_imports
         )
         
         # Lancer le workflow
@@ -72,7 +72,12 @@ def analyze_local_test_files():
         return []
     
     results = []
-    excel_files = list(test_dir.glob("*.xlsx")) + list(test_dir.glob("*.xls"))
+    # Un seul parcours du répertoire pour les deux extensions
+    with os.scandir(test_dir) as entries:
+        excel_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(('.xlsx', '.xls'))
+        )
     
     for file_path in excel_files:
         print(f"   📁 Analyse: {file_path.name}")
@@ -6,14 +6,28 @@ Traite un dossier à la fois, identifie les Excel pertinents et les importe imm
 
 import os
 import sys
+import asyncio
 import json
+import base64
+import heapq
+import queue
 import subprocess
+import threading
 import time
+import uuid
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
 
+# Parseur JSON rapide si disponible (même résultat que json.loads)
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,14 +39,193 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Nombre d'analyses de dossiers SharePoint lancées en parallèle
+MAX_CONCURRENT_SCANS = 4
+
+# Délai maximal d'analyse d'un dossier (secondes)
+FOLDER_SCAN_TIMEOUT = 300
+
+# Nombre de fichiers identifiés listés par dossier
+MAX_DISPLAYED_FILES = 5
+
+# Réponses acceptées comme confirmation
+YES_ANSWERS = frozenset({'o', 'oui', 'y', 'yes'})
+
+# Préfixe de la ligne de résultat JSON écrite par identify_relevant_files_sharepoint.py
+RESULT_SENTINEL = "###RESULT### "
+
+# Longueur maximale d'une ligne lue par asyncio (la ligne ###RESULT### peut être longue)
+CHILD_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def run_child_streaming(cmd: List[str], timeout: int, sentinel: Optional[str] = RESULT_SENTINEL,
+                        on_line: Optional[Callable[[str], None]] = None, tail_size: int = 50) -> Dict:
+    """
+    Lance un script enfant et lit sa sortie ligne par ligne au lieu de la bufferiser.
+    Seule la ligne préfixée par le sentinel est décodée en JSON ; dès qu'elle est
+    reçue, la lecture s'arrête et le processus est terminé.
+    
+    Args:
+        cmd: Commande à exécuter
+        timeout: Délai maximal en secondes (le processus est tué au-delà)
+        sentinel: Préfixe de la ligne de résultat JSON
+        on_line: Fonction appelée pour chaque ligne lue
+        tail_size: Nombre de dernières lignes conservées pour le diagnostic
+        
+    Returns:
+        Dict avec returncode, timed_out, data (objet JSON trouvé ou None) et tail (dernières lignes)
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1
+    )
+    timed_out = threading.Event()
+    
+    def kill_on_timeout():
+        timed_out.set()
+        process.kill()
+    
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.start()
+    
+    tail = deque(maxlen=tail_size)
+    data = None
+    try:
+        for line in process.stdout:
+            line = line.rstrip('\n')
+            tail.append(line)
+            if on_line:
+                on_line(line)
+            if sentinel and line.startswith(sentinel):
+                try:
+                    data = json_loads(line[len(sentinel):])
+                except ValueError:
+                    logger.warning("Ligne de résultat JSON illisible")
+                    continue
+                break
+    finally:
+        timer.cancel()
+        if data is not None and process.poll() is None:
+            process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+    
+    return {
+        'returncode': process.returncode,
+        'timed_out': timed_out.is_set(),
+        'data': data,
+        'tail': list(tail)
+    }
+
+
+
+async def run_child_async(cmd: List[str], timeout: float, sentinel: Optional[str] = RESULT_SENTINEL,
+                          on_line: Optional[Callable[[str], None]] = None, tail_size: int = 50) -> Dict:
+    """
+    Équivalent asyncio de run_child_streaming : plusieurs enfants sont lus depuis une même
+    boucle d'événements, et un dossier trop lent est tué sans interrompre les autres.
+    
+    Args:
+        cmd: Commande à exécuter
+        timeout: Délai maximal en secondes (le processus est tué au-delà)
+        sentinel: Préfixe de la ligne de résultat JSON
+        on_line: Fonction appelée pour chaque ligne lue
+        tail_size: Nombre de dernières lignes conservées pour le diagnostic
+        
+    Returns:
+        Dict avec returncode, timed_out, data (objet JSON trouvé ou None) et tail (dernières lignes)
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'},
+        limit=CHILD_LINE_LIMIT
+    )
+    tail = deque(maxlen=tail_size)
+    data = None
+    
+    async def read_output():
+        nonlocal data
+        async for raw_line in process.stdout:
+            line = raw_line.decode('utf-8', errors='replace').rstrip('\r\n')
+            tail.append(line)
+            if on_line:
+                on_line(line)
+            if sentinel and line.startswith(sentinel):
+                try:
+                    data = json_loads(line[len(sentinel):])
+                except ValueError:
+                    logger.warning("Ligne de résultat JSON illisible")
+                    continue
+                break
+    
+    timed_out = False
+    try:
+        await asyncio.wait_for(read_output(), timeout=timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+    
+    if process.returncode is None and (timed_out or data is not None):
+        try:
+            if timed_out:
+                process.kill()
+            else:
+                process.terminate()
+        except ProcessLookupError:
+            pass
+    await process.wait()
+    
+    return {
+        'returncode': process.returncode,
+        'timed_out': timed_out,
+        'data': data,
+        'tail': list(tail)
+    }
+
+def _emit(lines: List[str]):
+    """Écrit un bloc de lignes sur stdout avec un seul flush"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def load_identifier_entry_points():
+    """
+    Importe les points d'entrée du script d'identification pour l'appeler sans sous-processus
+    
+    Returns:
+        Tuple (build_arg_parser, run) ou None si le module n'est pas importable
+    """
+    try:
+        from scripts.identify_relevant_files_sharepoint import build_arg_parser, run
+        return build_arg_parser, run
+    except ImportError as e:
+        logger.warning(f"Import du script d'identification impossible, repli sur un sous-processus: {e}")
+        return None
+
 class ProgressiveDPGFProcessor:
     """Processeur progressif pour traiter les dossiers SharePoint un par un"""
     
-    def __init__(self, max_files_per_folder=10, min_confidence=0.2):
+    def __init__(self, max_files_per_folder=10, min_confidence=0.2, isolated=False):
         self.max_files_per_folder = max_files_per_folder
         self.min_confidence = min_confidence
+        # isolated=True : sous-processus même pour l'analyse d'un seul dossier
+        # (les analyses de plusieurs dossiers passent toujours par des sous-processus)
+        self.isolated = isolated
         self.work_dir = Path("progressive_import")
         self.work_dir.mkdir(exist_ok=True)
+        # Répertoire des rapports d'analyse, créé une seule fois pour tous les dossiers
+        self.analysis_dir = self.work_dir / "temp_analysis"
+        self.analysis_dir.mkdir(exist_ok=True)
         
         # Statistiques globales
         self.stats = {
@@ -57,37 +250,46 @@ class ProgressiveDPGFProcessor:
                 "--test-access"
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
+            # Extraire les noms de dossiers au fil de la sortie
+            folders = []
             
-            if result.returncode == 0:
-                # Parser la sortie pour extraire les noms de dossiers
-                folders = []
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if '[DIR]' in line and '2025' in line:
-                        # Extraire le nom du dossier
-                        parts = line.split('[DIR]')
-                        if len(parts) > 1:
-                            folder_name = parts[1].split('(')[0].strip()
-                            folders.append(folder_name)
-                
+            def collect_folder(line: str):
+                if '[DIR]' in line and '2025' in line:
+                    parts = line.split('[DIR]')
+                    if len(parts) > 1:
+                        folders.append(parts[1].split('(')[0].strip())
+            
+            result = run_child_streaming(cmd, timeout=300, sentinel=None, on_line=collect_folder)
+            
+            if result['returncode'] == 0:
                 # Trier par date (les plus récents en premier)
                 folders.sort(reverse=True)
                 return folders[:15]  # Prendre les 15 dossiers les plus récents
             else:
-                logger.error(f"Erreur lors de la récupération des dossiers: {result.stderr}")
+                tail_text = '\n'.join(result['tail'])
+                logger.error(f"Erreur lors de la récupération des dossiers: {tail_text}")
                 return []
                 
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des dossiers: {str(e)}")
             return []
     
-    def process_single_folder(self, folder_name: str) -> Dict:
-        """Traite un seul dossier : identification + téléchargement + import"""
+    def process_single_folder(self, folder_name: str, identified_files: Optional[List[Dict]] = None) -> Dict:
+        """
+        Traite un seul dossier : identification + téléchargement + import
+        
+        Args:
+            folder_name: Nom du dossier SharePoint
+            identified_files: Fichiers déjà identifiés (l'identification est lancée si None)
+        """
         folder_path = f"/{folder_name}"
-        print(f"\n{'='*80}")
-        print(f"📂 Traitement du dossier: {folder_name}")
-        print(f"{'='*80}")
+        # En-tête et identification affichés tout de suite ; seules les lignes de résultat
+        # par fichier sont regroupées et écrites en une fois
+        _emit([
+            f"\n{'='*80}",
+            f"📂 Traitement du dossier: {folder_name}",
+            f"{'='*80}"
+        ])
         
         folder_result = {
             'folder_name': folder_name,
@@ -100,33 +302,40 @@ class ProgressiveDPGFProcessor:
         
         try:
             # Étape 1: Identifier les fichiers DPGF dans ce dossier
-            print("🔍 Étape 1: Identification des fichiers DPGF...")
-            identified_files = self.identify_files_in_folder(folder_path)
+            _emit(["🔍 Étape 1: Identification des fichiers DPGF..."])
+            if identified_files is None:
+                identified_files = self.identify_files_in_folder(folder_path)
             
             if not identified_files:
-                print("❌ Aucun fichier DPGF trouvé dans ce dossier")
+                _emit(["❌ Aucun fichier DPGF trouvé dans ce dossier"])
                 return folder_result
             
             folder_result['files_found'] = len(identified_files)
-            print(f"✅ {len(identified_files)} fichier(s) DPGF identifié(s)")
+            lines = [f"✅ {len(identified_files)} fichier(s) DPGF identifié(s)"]
             
-            # Afficher les fichiers trouvés
-            for i, file_info in enumerate(identified_files, 1):
+            # Afficher les premiers fichiers trouvés (un dossier peut en contenir des centaines)
+            displayed_files = identified_files[:MAX_DISPLAYED_FILES]
+            for i, file_info in enumerate(displayed_files, 1):
                 confidence = file_info.get('confidence', 0)
-                print(f"   {i}. {file_info['name']} (confiance: {confidence:.2f})")
+                lines.append(f"   {i}. {file_info['name']} (confiance: {confidence:.2f})")
+            remaining = len(identified_files) - len(displayed_files)
+            if remaining:
+                lines.append(f"   ... et {remaining} autres fichiers")
             
             # Étape 2: Traiter chaque fichier individuellement
-            print(f"\n⬇️ Étape 2: Traitement individuel des {len(identified_files)} fichiers...")
+            lines.append(f"\n⬇️ Étape 2: Traitement individuel des {len(identified_files)} fichiers...")
+            _emit(lines)
             
+            file_lines = []
             for file_info in identified_files:
                 try:
                     success = self.process_single_file(file_info, folder_name)
                     if success:
                         folder_result['files_imported'] += 1
-                        print(f"   ✅ {file_info['name']} importé avec succès")
+                        file_lines.append(f"   ✅ {file_info['name']} importé avec succès")
                     else:
                         folder_result['errors'].append(f"Erreur import: {file_info['name']}")
-                        print(f"   ❌ Erreur lors de l'import de {file_info['name']}")
+                        file_lines.append(f"   ❌ Erreur lors de l'import de {file_info['name']}")
                         
                 except Exception as e:
                     error_msg = f"Erreur traitement {file_info['name']}: {str(e)}"
@@ -136,9 +345,10 @@ class ProgressiveDPGFProcessor:
             # Résumé du dossier
             if folder_result['files_imported'] > 0:
                 folder_result['success'] = True
-                print(f"\n🎉 Dossier traité avec succès: {folder_result['files_imported']}/{folder_result['files_found']} fichiers importés")
+                file_lines.append(f"\n🎉 Dossier traité avec succès: {folder_result['files_imported']}/{folder_result['files_found']} fichiers importés")
             else:
-                print(f"\n⚠️ Aucun fichier n'a pu être importé pour ce dossier")
+                file_lines.append(f"\n⚠️ Aucun fichier n'a pu être importé pour ce dossier")
+            _emit(file_lines)
             
         except Exception as e:
             error_msg = f"Erreur critique lors du traitement du dossier {folder_name}: {str(e)}"
@@ -150,56 +360,170 @@ class ProgressiveDPGFProcessor:
         
         return folder_result
     
-    def identify_files_in_folder(self, folder_path: str) -> List[Dict]:
-        """Identifie les fichiers DPGF dans un dossier spécifique"""
+    def _identifier_options(self, folder_path: str, output_basename: str) -> Dict:
+        """Options du script d'identification pour un dossier (noms des attributs argparse)"""
+        return {
+            'source': "sharepoint",
+            'folder': folder_path,
+            'mode': "quick",
+            'max_files': self.max_files_per_folder,
+            'min_confidence': self.min_confidence,
+            'formats': "json",
+            'reports_dir': str(self.analysis_dir),
+            'output_basename': output_basename
+        }
+    
+    def _identifier_command(self, identifier_options: Dict) -> List[str]:
+        """Commande du script d'identification, options passées en un seul bloc JSON (--json-args)"""
+        json_args = base64.b64encode(json.dumps(identifier_options).encode('utf-8')).decode('ascii')
+        return [sys.executable, "scripts/identify_relevant_files_sharepoint.py", "--json-args", json_args]
+    
+    def _files_from_child_result(self, result: Dict, folder_path: str, output_basename: str,
+                                 confidence_lines: List[str]) -> List[Dict]:
+        """
+        Extrait les fichiers identifiés du résultat d'un script enfant
+        
+        Args:
+            result: Résultat de run_child_streaming / run_child_async
+            folder_path: Chemin du dossier SharePoint
+            output_basename: Nom de base du rapport JSON écrit par l'enfant
+            confidence_lines: Lignes "confidence:" de la sortie (repli texte)
+        """
+        if result['timed_out']:
+            logger.warning(f"Timeout lors de l'analyse du dossier {folder_path}")
+            return []
+        
+        if result['data'] is not None:
+            return result['data'].get('identified_files', [])
+        
+        if result['returncode'] == 0:
+            # Pas de ligne de résultat : lire le fichier JSON généré
+            # (lecture directe plutôt que exists() + open : un seul accès disque)
+            json_file = self.analysis_dir / f"{output_basename}.json"
+            try:
+                data = json_loads(json_file.read_bytes())
+                return data.get('files', [])
+            except FileNotFoundError:
+                # Parser la sortie texte si pas de JSON
+                return self.parse_text_output('\n'.join(confidence_lines))
+        else:
+            tail_text = '\n'.join(result['tail'])
+            logger.error(f"Erreur identification dossier {folder_path}: {tail_text}")
+            return []
+    
+    def identify_files_in_folder(self, folder_path: str, output_basename: str = "folder_analysis") -> List[Dict]:
+        """
+        Identifie les fichiers DPGF dans un dossier spécifique
+        
+        Args:
+            folder_path: Chemin du dossier SharePoint
+            output_basename: Nom de base du rapport JSON (distinct par analyse concurrente)
+        """
         try:
-            # Créer un répertoire temporaire pour ce dossier
-            folder_work_dir = self.work_dir / "temp_analysis"
-            folder_work_dir.mkdir(exist_ok=True)
+            identifier_options = self._identifier_options(folder_path, output_basename)
             
-            cmd = [
-                sys.executable,
-                "scripts/identify_relevant_files_sharepoint.py",
-                "--source", "sharepoint",
-                "--folder", folder_path,
-                "--mode", "quick",
-                "--max-files", str(self.max_files_per_folder),
-                "--min-confidence", str(self.min_confidence),
-                "--formats", "json",
-                "--reports-dir", str(folder_work_dir),
-                "--output-basename", "folder_analysis"
-            ]
+            # Par défaut : appel direct dans l'interpréteur courant (pas de démarrage Python
+            # ni de réimport de pandas à chaque dossier)
+            entry_points = None if self.isolated else load_identifier_entry_points()
+            if entry_points is not None:
+                build_arg_parser, run_identifier = entry_points
+                args = build_arg_parser().parse_args([])
+                vars(args).update(identifier_options)
+                # Résultat retourné directement : aucun rapport disque n'est relu
+                args.no_disk_report = True
+                return run_identifier(args).get('identified_files', [])
             
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                encoding='utf-8',
-                errors='replace',
-                timeout=300  # 5 minutes max par dossier
-            )
+            # Lecture en continu : le résultat arrive sur la ligne ###RESULT###,
+            # les lignes "confidence:" sont gardées pour le repli sur la sortie texte
+            confidence_lines = []
             
-            if result.returncode == 0:
-                # Lire le fichier JSON généré
-                json_file = folder_work_dir / "folder_analysis.json"
-                if json_file.exists():
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    return data.get('files', [])
-                else:
-                    # Parser la sortie texte si pas de JSON
-                    return self.parse_text_output(result.stdout)
-            else:
-                logger.error(f"Erreur identification dossier {folder_path}: {result.stderr}")
-                return []
+            def collect_confidence(line: str):
+                if 'confidence:' in line.lower():
+                    confidence_lines.append(line)
+            
+            result = run_child_streaming(self._identifier_command(identifier_options),
+                                         timeout=FOLDER_SCAN_TIMEOUT, on_line=collect_confidence)
+            return self._files_from_child_result(result, folder_path, output_basename, confidence_lines)
                 
-        except subprocess.TimeoutExpired:
-            logger.warning(f"Timeout lors de l'analyse du dossier {folder_path}")
-            return []
         except Exception as e:
             logger.error(f"Erreur lors de l'identification dans {folder_path}: {str(e)}")
             return []
     
+    async def identify_files_in_folders_async(self, folders: List[str],
+                                              on_result: Optional[Callable[[str, List[Dict]], None]] = None) -> List[List[Dict]]:
+        """
+        Identifie les fichiers de plusieurs dossiers dans des sous-processus pilotés par asyncio
+        (au plus MAX_CONCURRENT_SCANS à la fois, timeout propre à chaque dossier)
+        
+        Args:
+            folders: Noms des dossiers SharePoint
+            on_result: Appelé avec (dossier, fichiers) dès que l'analyse d'un dossier se termine
+            
+        Returns:
+            Fichiers identifiés pour chaque dossier, dans l'ordre de folders
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+        
+        async def scan(folder: str) -> Tuple[str, List[Dict]]:
+            folder_path = f"/{folder}"
+            output_basename = f"folder_analysis_{uuid.uuid4().hex[:12]}"
+            confidence_lines = []
+            
+            def collect_confidence(line: str):
+                if 'confidence:' in line.lower():
+                    confidence_lines.append(line)
+            
+            async with semaphore:
+                try:
+                    cmd = self._identifier_command(self._identifier_options(folder_path, output_basename))
+                    result = await run_child_async(cmd, timeout=FOLDER_SCAN_TIMEOUT, on_line=collect_confidence)
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'identification dans {folder_path}: {str(e)}")
+                    return folder, []
+            return folder, self._files_from_child_result(result, folder_path, output_basename, confidence_lines)
+        
+        results = {}
+        for next_done in asyncio.as_completed([scan(folder) for folder in folders]):
+            folder, files = await next_done
+            results[folder] = files
+            if on_result:
+                on_result(folder, files)
+        return [results[folder] for folder in folders]
+    
+    def _iter_identified_folders(self, folders: List[str]):
+        """
+        Produit (dossier, fichiers identifiés) pour chaque dossier, dans l'ordre de fin des analyses.
+        Plusieurs dossiers sont toujours analysés dans des sous-processus asyncio : chacun a son
+        timeout (FOLDER_SCAN_TIMEOUT) et sa propre sortie, un appel Graph bloqué ne suspend pas le traitement.
+        La boucle asyncio tourne dans un thread : un dossier est traité dès que son analyse se termine,
+        pendant que les suivantes continuent.
+        """
+        if len(folders) == 1:
+            output_basename = f"folder_analysis_{uuid.uuid4().hex[:12]}"
+            yield folders[0], self.identify_files_in_folder(f"/{folders[0]}", output_basename)
+            return
+        
+        completed = queue.Queue()
+        
+        def run_scans():
+            try:
+                asyncio.run(self.identify_files_in_folders_async(
+                    folders, on_result=lambda folder, files: completed.put((folder, files))
+                ))
+            except Exception as e:
+                logger.error(f"Erreur lors de l'analyse des dossiers: {str(e)}")
+            finally:
+                completed.put(None)
+        
+        scanner = threading.Thread(target=run_scans, daemon=True)
+        scanner.start()
+        while True:
+            item = completed.get()
+            if item is None:
+                break
+            yield item
+        scanner.join()
+    
     def parse_text_output(self, output: str) -> List[Dict]:
         """Parse la sortie texte pour extraire les informations sur les fichiers"""
         files = []
@@ -270,17 +594,18 @@ class ProgressiveDPGFProcessor:
         
         # Demander confirmation
         response = input(f"\n🤔 Traiter ces {len(folders)} dossiers ? (o/N): ").strip().lower()
-        if response not in ['o', 'oui', 'y', 'yes']:
+        if response not in YES_ANSWERS:
             print("Traitement annulé par l'utilisateur")
             return self.stats
         
-        # Traiter chaque dossier
+        # Identifier les fichiers de plusieurs dossiers en parallèle (analyses SharePoint
+        # limitées par le réseau), puis traiter chaque dossier
         results = []
         
-        for i, folder in enumerate(folders, 1):
+        for i, (folder, identified_files) in enumerate(self._iter_identified_folders(folders), 1):
             print(f"\n📊 Progression: {i}/{len(folders)} dossiers")
             
-            folder_result = self.process_single_folder(folder)
+            folder_result = self.process_single_folder(folder, identified_files=identified_files)
             results.append(folder_result)
             
             # Mettre à jour les statistiques
@@ -290,11 +615,6 @@ class ProgressiveDPGFProcessor:
             self.stats['total_files_found'] += folder_result['files_found']
             self.stats['total_files_imported'] += folder_result['files_imported']
             self.stats['total_errors'] += len(folder_result['errors'])
-            
-            # Pause entre les dossiers pour éviter la surcharge
-            if i < len(folders):
-                print("⏸️ Pause de 2 secondes...")
-                time.sleep(2)
         
         # Afficher le résumé final
         self.display_final_summary(results)
@@ -321,11 +641,12 @@ class ProgressiveDPGFProcessor:
             print(f"📈 Taux de succès: {success_rate:.1f}%")
         
         # Afficher les dossiers les plus productifs
-        successful_folders = [r for r in results if r['files_imported'] > 0]
-        if successful_folders:
+        # Filtrage paresseux puis sélection des 5 meilleurs, sans trier toute la liste
+        top_folders = heapq.nlargest(5, (r for r in results if r['files_imported'] > 0),
+                                     key=lambda x: x['files_imported'])
+        if top_folders:
             print(f"\n🏆 Dossiers les plus productifs:")
-            successful_folders.sort(key=lambda x: x['files_imported'], reverse=True)
-            for i, folder in enumerate(successful_folders[:5], 1):
+            for i, folder in enumerate(top_folders, 1):
                 print(f"   {i}. {folder['folder_name']}: {folder['files_imported']} fichiers importés")
         
         # Sauvegarder les résultats
@@ -348,7 +669,8 @@ def main():
     # Créer le processeur
     processor = ProgressiveDPGFProcessor(
         max_files_per_folder=10,  # Limiter à 10 fichiers par dossier
-        min_confidence=0.2        # Confiance minimum de 20%
+        min_confidence=0.2,       # Confiance minimum de 20%
+        isolated='--isolated' in sys.argv  # Sous-processus même pour un seul dossier si demandé
     )
     
     # Lancer le traitement
@@ -12,6 +12,19 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import argparse
 
+# Réponses acceptées aux questions o/N
+YES_ANSWERS = frozenset({'o', 'oui', 'y', 'yes'})
+NO_ANSWERS = frozenset({'n', 'non', 'no'})
+
+# Orchestrateur lancé (importé dans ce processus, ou exécuté en sous-processus avec --subprocess)
+ORCHESTRATOR_SCRIPT = "orchestrate_dpgf_workflow_optimized.py"
+
+
+def ask_yes_no(prompt: str) -> bool:
+    """Pose une question o/N et retourne True si la réponse est affirmative"""
+    return input(prompt).strip().lower() in YES_ANSWERS
+
+
 # Profils de configuration prédéfinis
 CONFIGURATION_PROFILES = {
     "test": {
@@ -170,7 +183,7 @@ class OrchestratorConfig:
             print("\n2️⃣ Options supplémentaires:")
             
             # Clé Gemini
-            if input("   Utiliser Gemini pour l'analyse avancée? (o/N): ").strip().lower() in ['o', 'oui', 'y', 'yes']:
+            if ask_yes_no("   Utiliser Gemini pour l'analyse avancée? (o/N): "):
                 gemini_key = input("   Clé API Gemini: ").strip()
                 if gemini_key:
                     config['gemini_key'] = gemini_key
@@ -211,11 +224,11 @@ class OrchestratorConfig:
             config['batch_size'] = int(batch_size) if batch_size.isdigit() else 3
             
             # Options booléennes
-            config['deep_scan'] = input("   Analyse approfondie? (o/N): ").strip().lower() in ['o', 'oui', 'y', 'yes']
-            config['auto_import'] = input("   Import automatique? (o/N): ").strip().lower() in ['o', 'oui', 'y', 'yes']
+            config['deep_scan'] = ask_yes_no("   Analyse approfondie? (o/N): ")
+            config['auto_import'] = ask_yes_no("   Import automatique? (o/N): ")
             
             if config['auto_import']:
-                config['debug_import'] = input("   Debug import? (o/N): ").strip().lower() in ['o', 'oui', 'y', 'yes']
+                config['debug_import'] = ask_yes_no("   Debug import? (o/N): ")
             
         except (KeyboardInterrupt, EOFError):
             print("\n⚠️ Configuration par défaut utilisée")
@@ -246,8 +259,37 @@ class OrchestratorConfig:
         return validated
 
 
-def launch_orchestrator_with_config(config: Dict) -> int:
-    """Lance l'orchestrateur avec la configuration spécifiée"""
+def load_orchestrator_main():
+    """
+    Importe la fonction main() de l'orchestrateur pour l'exécuter dans ce processus
+    
+    Returns:
+        La fonction main de l'orchestrateur, ou None si le module ne peut pas être importé
+    """
+    project_dir = str(Path(__file__).parent)
+    if project_dir not in sys.path:
+        sys.path.insert(0, project_dir)
+    
+    try:
+        from orchestrate_dpgf_workflow_optimized import main as workflow_main
+        return workflow_main
+    except (ImportError, SystemExit) as e:
+        # L'orchestrateur quitte (SystemExit) si ses propres dépendances sont absentes
+        print(f"⚠️ Import de l'orchestrateur impossible ({e}), lancement en sous-processus")
+        return None
+
+
+def launch_orchestrator_with_config(config: Dict, use_subprocess: bool = False) -> int:
+    """
+    Lance l'orchestrateur avec la configuration spécifiée
+    
+    Args:
+        config: Configuration validée
+        use_subprocess: Exécuter l'orchestrateur dans un interpréteur séparé (isolation)
+        
+    Returns:
+        Code de retour de l'orchestrateur
+    """
     print("🚀 LANCEMENT DE L'ORCHESTRATEUR")
     print("="*40)
     
@@ -259,22 +301,22 @@ def launch_orchestrator_with_config(config: Dict) -> int:
         else:
             print(f"   {key}: {'***configuré***' if value else 'non configuré'}")
     
-    # Construire la commande
-    cmd = [sys.executable, "launch_orchestrator.py"]
-    
-    # Ajouter les arguments
+    # Construire les arguments de l'orchestrateur
+    orchestrator_args = []
     for key, value in config.items():
         if isinstance(value, bool) and value:
-            cmd.append(f"--{key.replace('_', '-')}")
+            orchestrator_args.append(f"--{key.replace('_', '-')}")
         elif not isinstance(value, bool) and value is not None:
-            cmd.extend([f"--{key.replace('_', '-')}", str(value)])
+            orchestrator_args.extend([f"--{key.replace('_', '-')}", str(value)])
+    
+    cmd = [sys.executable, ORCHESTRATOR_SCRIPT] + orchestrator_args
     
     print(f"\n🔧 Commande: {' '.join(cmd[:3])} [... {len(cmd)-3} arguments]")
     
     # Confirmation
     try:
         confirm = input("\n▶️ Lancer l'orchestrateur? (O/n): ").strip()
-        if confirm.lower() in ['n', 'non', 'no']:
+        if confirm.lower() in NO_ANSWERS:
             print("❌ Lancement annulé")
             return 1
     except (KeyboardInterrupt, EOFError):
@@ -284,6 +326,15 @@ def launch_orchestrator_with_config(config: Dict) -> int:
     # Lancer
     try:
         print("\n🚀 Lancement en cours...")
+        
+        # Exécution dans ce processus : pas de nouvel interpréteur ni de réimport des dépendances
+        workflow_main = None if use_subprocess else load_orchestrator_main()
+        if workflow_main is not None:
+            try:
+                return workflow_main(orchestrator_args) or 0
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        
         result = subprocess.run(cmd, cwd=Path(__file__).parent)
         return result.returncode
     except Exception as e:
@@ -335,6 +386,8 @@ Exemples d'utilisation:
                        help='Nombre maximum de dossiers')
     parser.add_argument('--no-launch', action='store_true',
                        help='Configurer seulement, ne pas lancer')
+    parser.add_argument('--subprocess', action='store_true',
+                       help='Lancer l\'orchestrateur dans un processus Python séparé (isolation)')
     
     args = parser.parse_args()
     
@@ -365,7 +418,7 @@ Exemples d'utilisation:
                     print(result.stderr)
                 
                 confirm = input("\n▶️ Continuer malgré les problèmes? (o/N): ").strip()
-                if confirm.lower() not in ['o', 'oui', 'y', 'yes']:
+                if confirm.lower() not in YES_ANSWERS:
                     print("❌ Lancement annulé")
                     return 1
                     
@@ -409,7 +462,7 @@ Exemples d'utilisation:
         
         # Lancer l'orchestrateur si demandé
         if not args.no_launch:
-            return launch_orchestrator_with_config(config)
+            return launch_orchestrator_with_config(config, use_subprocess=args.subprocess)
         else:
             print("✅ Configuration sauvegardée sans lancement")
             return 0
@@ -356,9 +356,10 @@ class LotPatternExtractor:
             df = self.parser.df
             
             # Recherche simple de "LOT X" dans les premières lignes
-            for i in range(min(10, len(df))):
-                for col in range(min(5, df.shape[1])):
-                    cell = str(df.iloc[i, col]).strip() if pd.notna(df.iloc[i, col]) else ""
+            # Fenêtre 10x5 extraite une seule fois en ndarray (évite un iloc par cellule)
+            for row in df.iloc[:10, :5].to_numpy(dtype=object):
+                for value in row:
+                    cell = str(value).strip() if pd.notna(value) else ""
                     if cell and re.search(r'lot\s*\d+', cell.lower()):
                         return [(cell, cell)]  # Tuple simpliste pour la détection
             
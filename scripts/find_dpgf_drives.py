@@ -8,8 +8,12 @@ import argparse
 import requests
 import msal
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# Sites interrogés simultanément lors de la recherche des drives
+MAX_CONCURRENT_SITE_LOOKUPS = 8
+
 def get_access_token():
     """Obtient un token d'accès pour Microsoft Graph API"""
     load_dotenv()
@@ -96,7 +100,7 @@ def find_drives_for_site(token, site_id, site_name):
             return []
         
         drives = response.json().get("value", [])
-        print(f"✅ {len(drives)} drives trouvés")
+        print(f"✅ {len(drives)} drives trouvés pour le site: {site_name}")
         return drives
         
     except Exception as e:
@@ -274,14 +278,19 @@ def search_for_drives_with_dpgf(token):
         print("⚠️ Aucun site SharePoint trouvé ou accessible")
         print("   Vérifiez que vous avez bien la permission 'Sites.Read.All'")
     
-    # 2. Trouver tous les drives pour chaque site
+    # 2. Trouver tous les drives pour chaque site (requêtes indépendantes lancées en parallèle)
     drives_by_site = {}
-    for site in sites:
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SITE_LOOKUPS) as executor:
+        site_drives = list(executor.map(
+            lambda site: find_drives_for_site(token, site.get("id"), site.get("displayName", "Sans nom")),
+            sites
+        ))
+    
+    for site, drives in zip(sites, site_drives):
         site_id = site.get("id")
         site_name = site.get("displayName", "Sans nom")
         site_url = site.get("webUrl", "")
         
-        drives = find_drives_for_site(token, site_id, site_name)
         if drives:
             drives_by_site[site_name] = {
                 "site_id": site_id,
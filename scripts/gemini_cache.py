@@ -0,0 +1,100 @@
+"""
+Cache persistant des réponses Gemini pour la détection de lots.
+Les réponses sont stockées dans une base SQLite, indexées par modèle,
+version du prompt et contenu normalisé de l'en-tête du fichier.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Version du prompt de détection de lot : à incrémenter à chaque modification du prompt
+PROMPT_VERSION = "lot-v2"
+
+# Durée de validité par défaut d'une réponse en cache (7 jours)
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def normalize_header(header: str) -> str:
+    """Normalise un en-tête (casse, espaces) pour que des fichiers quasi identiques partagent la même clé"""
+    lines = (' '.join(line.lower().split()) for line in header.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+class GeminiResponseCache:
+    """Cache SQLite des réponses Gemini avec durée de validité"""
+
+    def __init__(self, db_path: str = "cache/gemini_responses.sqlite", ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "prompt_version TEXT NOT NULL, "
+            "value BLOB NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def make_key(self, model_name: str, header: str, prompt_version: str = PROMPT_VERSION) -> str:
+        """Calcule la clé de cache d'un en-tête pour un modèle et une version de prompt"""
+        raw = f"{model_name}|{prompt_version}|{normalize_header(header)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Récupère une réponse en cache (None si absente ou expirée)"""
+        row = self.conn.execute(
+            "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at = row
+        if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+            return None
+
+        try:
+            return json.loads(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Entrée de cache Gemini illisible ignorée: {key}")
+            return None
+
+    def set(self, key: str, value: Any, prompt_version: str = PROMPT_VERSION):
+        """Enregistre une réponse en cache"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, prompt_version, value, created_at) VALUES (?, ?, ?, ?)",
+            (key, prompt_version, json.dumps(value, ensure_ascii=False), time.time())
+        )
+        self.conn.commit()
+
+    def invalidate(self, prompt_version: Optional[str] = None) -> int:
+        """
+        Supprime les réponses en cache
+
+        Args:
+            prompt_version: Version de prompt à invalider (toutes les entrées si None)
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        if prompt_version is None:
+            cursor = self.conn.execute("DELETE FROM responses")
+        else:
+            cursor = self.conn.execute("DELETE FROM responses WHERE prompt_version = ?", (prompt_version,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """Ferme la connexion à la base"""
+        self.conn.close()
@@ -35,25 +35,33 @@ import sys
 import re
 import shutil
 import argparse
+import base64
+import functools
+import io
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Tuple, Optional, Union
-import pandas as pd
-import numpy as np
+from typing import TYPE_CHECKING, Callable, Dict, List, Set, Tuple, Optional, Union
 from tqdm import tqdm
 import time
 import concurrent.futures
+import threading
 from collections import Counter
-import tempfile
 import requests
+from requests.adapters import HTTPAdapter
 import msal
 from dotenv import load_dotenv
 from urllib.parse import urlparse, unquote
 import json
 import csv
 import subprocess
+import sqlite3
 import unicodedata
+import uuid
+
+# pandas n'est importé qu'à l'usage (lecture Excel, rapports) ; ici uniquement pour les annotations
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Configuration de l'encodage pour Windows
 if sys.platform.startswith('win'):
@@ -94,6 +102,131 @@ logger = logging.getLogger(__name__)
 # Extensions de fichiers à considérer
 EXCEL_EXTENSIONS = {'.xlsx', '.xls', '.xlsm'}
 
+# Session HTTP partagée : connexions keep-alive réutilisées (pas de nouvelle poignée TLS à chaque appel Graph).
+# Pas de retry au niveau de l'adaptateur, les relances sont gérées par les appelants.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0))
+
+# Délais (connexion, lecture) en secondes appliqués à chaque appel de HTTP_SESSION :
+# un appel Graph bloqué échoue au lieu de suspendre l'analyse indéfiniment
+HTTP_TIMEOUT = (10, 60)
+
+# Requêtes groupées Microsoft Graph (JSON batching, 20 requêtes maximum par appel)
+GRAPH_BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+GRAPH_BATCH_MAX_REQUESTS = 20
+
+# Nombre de dossiers listés en parallèle lors d'un parcours récursif (aligné sur pool_maxsize)
+LISTING_MAX_WORKERS = 16
+# Plafond global des listages simultanés, partagé par tous les parcours en cours
+# (l'orchestrateur traite plusieurs dossiers en parallèle avec la même session)
+LISTING_SEMAPHORE = threading.BoundedSemaphore(LISTING_MAX_WORKERS)
+# Nouvelles tentatives d'une page de listage refusée par Graph (429), après le délai Retry-After
+LISTING_THROTTLE_RETRIES = 3
+
+# Taille des blocs écrits sur disque lors d'un téléchargement (moins d'appels système qu'avec 8 Ko)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Préfixe de la ligne JSON finale lue par les scripts appelants sur stdout
+RESULT_SENTINEL = "###RESULT### "
+
+# Nombre de fichiers racine classés sur leur nom conservés dans un résumé de dossier
+SAMPLE_IDENTIFIED_MAX = 50
+
+# En dessous de ce nombre de fichiers locaux, l'analyse se fait sans pool de processus
+LOCAL_PARALLEL_MIN_FILES = 4
+
+# Cache local des résumés de dossiers (le nombre de fichiers évolue lentement)
+FOLDER_META_CACHE_PATH = Path(".cache") / "dpgf_folder_meta.sqlite"
+FOLDER_META_TTL_SECONDS = 3600
+
+# DPGF_CACHE_BUST=1 : vider le cache des résumés au premier accès de ce processus
+_folder_meta_bust_pending = os.getenv("DPGF_CACHE_BUST") == "1"
+
+# Résumés déjà lus ou calculés dans ce processus : {(drive, chemin): (résumé, horodatage)}
+# (appels répétés via run() sans relire la base SQLite)
+_folder_summary_memo: Dict[Tuple[str, str], Tuple[Dict, float]] = {}
+
+
+def _open_folder_meta_cache() -> sqlite3.Connection:
+    """Ouvre (et crée si besoin) la base SQLite du cache des dossiers"""
+    global _folder_meta_bust_pending
+    FOLDER_META_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(FOLDER_META_CACHE_PATH))
+    # Ancienne table indexée sur le seul chemin (collisions entre drives)
+    conn.execute("DROP TABLE IF EXISTS folder_meta")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS folder_summary ("
+        "drive_id TEXT NOT NULL, path TEXT NOT NULL, total INTEGER NOT NULL, summary TEXT NOT NULL, "
+        "ts REAL NOT NULL, PRIMARY KEY (drive_id, path))"
+    )
+    if _folder_meta_bust_pending:
+        _folder_meta_bust_pending = False
+        conn.execute("DELETE FROM folder_summary")
+        conn.commit()
+        _folder_summary_memo.clear()
+        logger.info("Cache des résumés de dossiers vidé (DPGF_CACHE_BUST=1)")
+    return conn
+
+
+def get_cached_folder_summary(drive_id: str, folder_path: str, ttl: int = FOLDER_META_TTL_SECONDS) -> Optional[Dict]:
+    """
+    Retourne le résumé en cache d'un dossier s'il est encore valide
+    
+    Args:
+        drive_id: Identifiant du drive SharePoint (GRAPH_DRIVE_ID)
+        folder_path: Chemin du dossier SharePoint
+        ttl: Durée de validité en secondes
+        
+    Returns:
+        Résumé du dossier ou None si absent/expiré
+    """
+    key = (drive_id, folder_path)
+    memo = _folder_summary_memo.get(key)
+    if memo is not None and time.time() - memo[1] <= ttl:
+        return memo[0]
+    
+    try:
+        conn = _open_folder_meta_cache()
+        try:
+            row = conn.execute("SELECT summary, ts FROM folder_summary WHERE drive_id = ? AND path = ?",
+                               key).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Cache des dossiers indisponible: {str(e)}")
+        return None
+    
+    if row is None or time.time() - row[1] > ttl:
+        return None
+    summary = json.loads(row[0])
+    _folder_summary_memo[key] = (summary, row[1])
+    return summary
+
+
+def store_folder_summary(drive_id: str, folder_path: str, summary: Dict) -> None:
+    """
+    Enregistre le résumé d'un dossier dans le cache local
+    
+    Args:
+        drive_id: Identifiant du drive SharePoint (GRAPH_DRIVE_ID)
+        folder_path: Chemin du dossier SharePoint
+        summary: Résumé retourné par SharePointClient.get_folders_summary
+    """
+    try:
+        conn = _open_folder_meta_cache()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO folder_summary (drive_id, path, total, summary, ts) VALUES (?, ?, ?, ?, ?)",
+                (drive_id, folder_path, summary.get('estimated_files', 0), json.dumps(summary, ensure_ascii=False), time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Impossible d'écrire dans le cache des dossiers: {str(e)}")
+    
+    _folder_summary_memo[(drive_id, folder_path)] = (summary, time.time())
+
 # Mots-clés pour identifier les types de documents
 KEYWORDS = {
     'DPGF': [
@@ -149,6 +282,40 @@ COLUMNS_PATTERNS = {
     ]
 }
 
+
+def graph_batch_requests(headers: Dict[str, str], relative_urls: List[str]) -> List[Dict]:
+    """
+    Envoie plusieurs GET Microsoft Graph en requêtes $batch (un aller-retour par groupe de 20)
+    
+    Args:
+        headers: En-têtes HTTP avec le token d'accès
+        relative_urls: URLs relatives à https://graph.microsoft.com/v1.0 (ex: "/drives")
+        
+    Returns:
+        Liste des réponses {'status': ..., 'body': ...} dans l'ordre des URLs
+        
+    Raises:
+        requests.HTTPError: si la requête $batch elle-même échoue
+    """
+    headers = {**headers, "Content-Type": "application/json"}
+    responses = {}
+    
+    for start in range(0, len(relative_urls), GRAPH_BATCH_MAX_REQUESTS):
+        chunk = relative_urls[start:start + GRAPH_BATCH_MAX_REQUESTS]
+        payload = {
+            "requests": [
+                {"id": str(start + i), "method": "GET", "url": url}
+                for i, url in enumerate(chunk)
+            ]
+        }
+        response = HTTP_SESSION.post(GRAPH_BATCH_URL, headers=headers, json=payload, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        for item in response.json().get('responses', []):
+            responses[item['id']] = item
+    
+    return [responses.get(str(i), {'status': None, 'body': {}}) for i in range(len(relative_urls))]
+
+
 class SharePointClient:
     """Client pour accéder aux fichiers SharePoint via Microsoft Graph API"""
     
@@ -221,7 +388,9 @@ class SharePointClient:
                            f"   • Vérifiez que GRAPH_DRIVE_ID correspond au bon drive\n"
                            f"   • Le dossier a peut-être été déplacé ou supprimé")
         elif response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', 'non précisé')
             raise Exception(f"❌ Erreur 429 - Trop de requêtes lors de {operation}.\n"
+                           f"   Retry-After: {retry_after}\n"
                            f"🔧 Solutions possibles:\n"
                            f"   • Attendez quelques minutes avant de réessayer\n"
                            f"   • Réduisez le nombre de fichiers traités simultanément")
@@ -278,7 +447,7 @@ class SharePointClient:
         
         # Requête pour obtenir l'ID du site
         site_request_url = f"https://graph.microsoft.com/v1.0/sites/{hostname}:{site_path}"
-        response = requests.get(site_request_url, headers=headers)
+        response = HTTP_SESSION.get(site_request_url, headers=headers, timeout=HTTP_TIMEOUT)
         
         if response.status_code == 200:
             site_data = response.json()
@@ -286,7 +455,7 @@ class SharePointClient:
             
             # Obtenir l'ID du drive par défaut du site
             drive_request_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive"
-            drive_response = requests.get(drive_request_url, headers=headers)
+            drive_response = HTTP_SESSION.get(drive_request_url, headers=headers, timeout=HTTP_TIMEOUT)
             
             if drive_response.status_code == 200:
                 drive_data = drive_response.json()
@@ -320,7 +489,7 @@ class SharePointClient:
             url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root:/{encoded_path}:/children?$top=10"
         
         try:
-            response = requests.get(url, headers=headers)
+            response = HTTP_SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 
@@ -370,6 +539,70 @@ class SharePointClient:
         
         return files
 
+    def _children_request_url(self, folder_path: str, top: Optional[int] = None) -> str:
+        """
+        Construit l'URL relative (pour $batch) listant les enfants d'un dossier
+        
+        Args:
+            folder_path: Chemin du dossier
+            top: Nombre maximum d'éléments retournés
+            
+        Returns:
+            URL relative à https://graph.microsoft.com/v1.0
+        """
+        if folder_path == "/":
+            url = f"/drives/{self.drive_id}/root/children"
+        else:
+            encoded_path = requests.utils.quote(folder_path.lstrip('/'), safe='/')
+            url = f"/drives/{self.drive_id}/root:/{encoded_path}:/children"
+        return f"{url}?$top={top}" if top else url
+    
+    def graph_batch(self, relative_urls: List[str]) -> List[Optional[Dict]]:
+        """
+        Exécute plusieurs GET Microsoft Graph en une seule requête HTTP ($batch)
+        
+        Args:
+            relative_urls: URLs relatives à https://graph.microsoft.com/v1.0
+            
+        Returns:
+            Corps JSON de chaque réponse, dans l'ordre des URLs (None en cas d'erreur)
+        """
+        token = self.get_access_token()
+        try:
+            responses = graph_batch_requests({"Authorization": f"Bearer {token}"}, relative_urls)
+        except requests.HTTPError as e:
+            self._handle_sharepoint_error(e.response, "la requête groupée ($batch)")
+        
+        results: List[Optional[Dict]] = []
+        for url, item in zip(relative_urls, responses):
+            if item.get('status') == 200:
+                results.append(item.get('body', {}))
+            else:
+                logger.warning(f"Requête groupée en échec ({item.get('status')}): {url}")
+                results.append(None)
+        
+        return results
+
+    def batch_get_download_urls(self, item_ids: List[str]) -> Dict[str, str]:
+        """
+        Récupère les URLs de téléchargement pré-authentifiées de plusieurs fichiers ($batch)
+        
+        Args:
+            item_ids: IDs des fichiers SharePoint
+            
+        Returns:
+            Dict[str, str]: URL de téléchargement par ID (les fichiers en échec sont absents)
+        """
+        bodies = self.graph_batch([
+            f"/drives/{self.drive_id}/items/{item_id}?$select=id,@microsoft.graph.downloadUrl"
+            for item_id in item_ids
+        ])
+        return {
+            item_id: body['@microsoft.graph.downloadUrl']
+            for item_id, body in zip(item_ids, bodies)
+            if body and body.get('@microsoft.graph.downloadUrl')
+        }
+
     def list_files_in_folder(self, folder_path: str = "/", recursive: bool = True) -> List[Dict]:
         """
         Liste les fichiers dans un dossier SharePoint
@@ -390,9 +623,12 @@ class SharePointClient:
         if not self.drive_id:
             raise ValueError("GRAPH_DRIVE_ID non défini dans les variables d'environnement")
         
-        def scan_folder(path: str):
-            # Normaliser le chemin pour éviter les problèmes d'encodage
-            path = sanitize_sharepoint_path(path)
+        def scan_folder(path: str, normalize: bool = True) -> List[str]:
+            """Liste un dossier (toutes les pages) et retourne les chemins des sous-dossiers à parcourir"""
+            subfolders = []
+            # Normaliser le chemin pour éviter les problèmes d'encodage (sauf nouvel essai avec le chemin brut)
+            if normalize:
+                path = sanitize_sharepoint_path(path)
             
             if path == "/":
                 base_url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root/children"
@@ -422,10 +658,12 @@ class SharePointClient:
             
             # Gérer la pagination pour obtenir TOUS les fichiers
             url = base_url
+            throttle_retries = 0
             
             try:
                 while url:
-                    response = requests.get(url, headers=headers)
+                    with LISTING_SEMAPHORE:
+                        response = HTTP_SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT)
                     if response.status_code == 200:
                         data = response.json()
                         
@@ -457,20 +695,8 @@ class SharePointClient:
                                 files.append(folder_info)
                                 
                                 if recursive:
-                                    # Construire le chemin du sous-dossier avec gestion UTF-8
-                                    try:
-                                        folder_path_new = f"{path.rstrip('/')}/{item['name']}"
-                                        # Normaliser le chemin du sous-dossier
-                                        folder_path_new = sanitize_sharepoint_path(folder_path_new)
-                                        scan_folder(folder_path_new)
-                                    except Exception as e:
-                                        logger.warning(f"Erreur lors du scan du sous-dossier {item['name']}: {str(e)}")
-                                        # Essayer quand même avec le chemin brut
-                                        try:
-                                            folder_path_new = f"{path.rstrip('/')}/{item['name']}"
-                                            scan_folder(folder_path_new)
-                                        except:
-                                            logger.error(f"Impossible de scanner le dossier: {item['name']}")
+                                    # Le sous-dossier sera listé en parallèle (normalisé par scan_folder)
+                                    subfolders.append(f"{path.rstrip('/')}/{item['name']}")
                         
                         # Vérifier s'il y a une page suivante
                         url = data.get('@odata.nextLink')
@@ -483,7 +709,8 @@ class SharePointClient:
                                 # Essayer avec un encodage URL différent
                                 alt_encoded_path = requests.utils.quote(path.lstrip('/'), safe='/', encoding='utf-8', errors='replace')
                                 alt_url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root:/{alt_encoded_path}:/children"
-                                alt_response = requests.get(alt_url, headers=headers)
+                                with LISTING_SEMAPHORE:
+                                    alt_response = HTTP_SESSION.get(alt_url, headers=headers, timeout=HTTP_TIMEOUT)
                                 if alt_response.status_code == 200:
                                     logger.info(f"Succès avec encodage alternatif pour: {path}")
                                     # Traiter la réponse alternative
@@ -494,39 +721,72 @@ class SharePointClient:
                             except Exception as e:
                                 logger.debug(f"Erreur avec encodage alternatif pour {path}: {str(e)}")
                         break
+                    elif response.status_code == 429 and throttle_retries < LISTING_THROTTLE_RETRIES:
+                        throttle_retries += 1
+                        retry_after = response.headers.get('Retry-After', '')
+                        delay = int(retry_after) if retry_after.isdigit() else 2 ** throttle_retries
+                        logger.warning(f"⏳ Listage limité par Graph (429) pour {path}, nouvel essai dans {delay}s")
+                        time.sleep(delay)
                     else:
                         logger.error(f"Erreur lors de la lecture du dossier {path}: {response.status_code} - {response.text}")
                         break
                         
             except Exception as e:
                 logger.error(f"Erreur lors du scan du dossier {path}: {str(e)}")
-        
-        scan_folder(folder_path)
-        return files
-    
-    def download_file(self, file_id: str, local_path: str) -> bool:
+            
+            return subfolders
+        
+        # Parcours en largeur : chaque sous-dossier découvert est listé dès qu'un worker est libre,
+        # la durée suit la profondeur de l'arborescence plutôt que le nombre de dossiers
+        with concurrent.futures.ThreadPoolExecutor(max_workers=LISTING_MAX_WORKERS) as executor:
+            # future -> (chemin, nouvel essai avec le chemin brut possible)
+            pending = {executor.submit(scan_folder, folder_path): (folder_path, False)}
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    scanned_path, can_retry_raw = pending.pop(future)
+                    try:
+                        subfolders = future.result()
+                    except Exception as e:
+                        if can_retry_raw:
+                            logger.warning(f"Erreur lors du scan du sous-dossier {scanned_path}: {str(e)}")
+                            # Essayer quand même avec le chemin brut
+                            pending[executor.submit(scan_folder, scanned_path, False)] = (scanned_path, False)
+                        else:
+                            logger.error(f"Impossible de scanner le dossier: {scanned_path}")
+                        continue
+                    for subfolder in subfolders:
+                        pending[executor.submit(scan_folder, subfolder)] = (subfolder, True)
+        
+        # Ordre stable quel que soit l'ordre de fin des listages (les appelants tronquent la liste)
+        return sorted(files, key=lambda f: f['path'])
+    
+    def download_file(self, file_id: str, local_path: str, download_url: Optional[str] = None) -> bool:
         """
         Télécharge un fichier depuis SharePoint
         
         Args:
             file_id: ID du fichier SharePoint
             local_path: Chemin local où enregistrer le fichier
+            download_url: URL pré-authentifiée déjà connue (voir batch_get_download_urls)
             
         Returns:
             bool: True si le téléchargement a réussi
         """
-        token = self.get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        
-        # Obtenir l'URL de téléchargement
-        url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/items/{file_id}/content"
+        if download_url:
+            # URL pré-authentifiée : ni token ni redirection via /content
+            url, headers = download_url, {}
+        else:
+            token = self.get_access_token()
+            headers = {"Authorization": f"Bearer {token}"}
+            url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/items/{file_id}/content"
         
         try:
-            response = requests.get(url, headers=headers, stream=True)
+            response = HTTP_SESSION.get(url, headers=headers, stream=True, timeout=HTTP_TIMEOUT)
             if response.status_code == 200:
                 os.makedirs(os.path.dirname(local_path), exist_ok=True)
                 with open(local_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                         f.write(chunk)
                 return True
             else:
@@ -536,16 +796,52 @@ class SharePointClient:
             logger.error(f"Erreur lors du téléchargement: {str(e)}")
             return False
 
-    def get_folders_summary(self, folder_path: str = "/") -> Dict:
+    def download_to_buffer(self, file_id: str) -> Optional[io.BytesIO]:
+        """
+        Télécharge un fichier SharePoint en mémoire, sans passer par un fichier temporaire
+        
+        Args:
+            file_id: ID du fichier SharePoint
+            
+        Returns:
+            Optional[io.BytesIO]: Contenu du fichier (positionné au début), None en cas d'échec
+        """
+        token = self.get_access_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/items/{file_id}/content"
+        
+        try:
+            with HTTP_SESSION.get(url, headers=headers, stream=True, timeout=HTTP_TIMEOUT) as response:
+                if response.status_code != 200:
+                    logger.error(f"Erreur lors du téléchargement: {response.status_code}")
+                    return None
+                # Décompression gzip/deflate éventuelle gérée par urllib3
+                response.raw.decode_content = True
+                buffer = io.BytesIO()
+                shutil.copyfileobj(response.raw, buffer)
+            buffer.seek(0)
+            return buffer
+        except Exception as e:
+            logger.error(f"Erreur lors du téléchargement: {str(e)}")
+            return None
+
+    def get_folders_summary(self, folder_path: str = "/", use_cache: bool = True) -> Dict:
         """
         Obtient un résumé rapide des dossiers pour évaluation
         
         Args:
             folder_path: Chemin du dossier racine
+            use_cache: Réutiliser un résumé récent du cache local (.cache/dpgf_folder_meta.sqlite)
             
         Returns:
             Dict: Résumé des dossiers avec comptages
         """
+        if use_cache:
+            cached = get_cached_folder_summary(self.drive_id, folder_path)
+            if cached is not None:
+                logger.info(f"Résumé du dossier {folder_path} lu depuis le cache")
+                return cached
+        
         try:
             all_root_items = self.list_files_in_folder(folder_path, recursive=False)
             folders = [item for item in all_root_items if item.get('type') == 'folder']
@@ -556,25 +852,38 @@ class SharePointClient:
                 'estimated_files': 0
             }
             
-            # Pour les 5 premiers dossiers, obtenir un aperçu rapide
+            # Pour les 5 premiers dossiers, obtenir un aperçu rapide (une seule requête $batch)
             sample_folders = folders[:5]
-            for folder in sample_folders:
-                folder_path_current = f"{folder_path.rstrip('/')}/{folder['name']}"
-                try:
-                    # Compter seulement les 50 premiers éléments pour estimation
-                    first_files = self.list_first_10_files(folder_path_current)
-                    
-                    folder_info = {
-                        'name': folder['name'],
-                        'sample_files': len(first_files),
-                        'excel_files': len([f for f in first_files if any(f['name'].lower().endswith(ext) for ext in EXCEL_EXTENSIONS)])
-                    }
-                    summary['folders'].append(folder_info)
-                    summary['estimated_files'] += folder_info['sample_files'] * 5  # Estimation grossière
-                    
-                except Exception as e:
-                    logger.warning(f"Erreur lors de l'aperçu de {folder['name']}: {str(e)}")
+            try:
+                listings = self.graph_batch([
+                    self._children_request_url(f"{folder_path.rstrip('/')}/{folder['name']}", top=10)
+                    for folder in sample_folders
+                ])
+            except Exception as e:
+                logger.warning(f"Erreur lors de l'aperçu groupé des dossiers: {str(e)}")
+                listings = [None] * len(sample_folders)
+            
+            for folder, listing in zip(sample_folders, listings):
+                if listing is None:
+                    logger.warning(f"Erreur lors de l'aperçu de {folder['name']}")
+                    continue
+                
+                first_files = listing.get('value', [])
+                folder_info = {
+                    'name': folder['name'],
+                    'sample_files': len(first_files),
+                    'excel_files': len([f for f in first_files if 'file' in f and any(f['name'].lower().endswith(ext) for ext in EXCEL_EXTENSIONS)])
+                }
+                summary['folders'].append(folder_info)
+                summary['estimated_files'] += folder_info['sample_files'] * 5  # Estimation grossière
+            
+            # Fichiers Excel à la racine, classés sur leur nom (réutilisables sans nouvelle analyse)
+            root_excel_files = [item for item in all_root_items
+                                if item.get('type') == 'file' and any(item['name'].lower().endswith(ext) for ext in EXCEL_EXTENSIONS)]
+            summary['root_excel_files'] = len(root_excel_files)
+            summary['sample_identified'] = [identify_from_filename(f) for f in root_excel_files[:SAMPLE_IDENTIFIED_MAX]]
             
+            store_folder_summary(self.drive_id, folder_path, summary)
             return summary
             
         except Exception as e:
@@ -582,6 +891,20 @@ class SharePointClient:
             return {'total_folders': 0, 'folders': [], 'estimated_files': 0}
 
 
+@functools.lru_cache(maxsize=1)
+def get_client() -> SharePointClient:
+    """
+    Retourne le client SharePoint partagé du processus
+    
+    Un seul client par processus : le token Graph n'est acquis qu'une fois et
+    réutilisé par tous les appelants (identifications successives, workers).
+    
+    Returns:
+        SharePointClient: Client initialisé depuis les variables d'environnement
+    """
+    return SharePointClient()
+
+
 def sanitize_sharepoint_path(path: str) -> str:
     """
     Nettoie et normalise un chemin SharePoint pour éviter les erreurs d'encodage
@@ -641,7 +964,7 @@ def normalize_string(s: str) -> str:
     s = re.sub(r'[^a-z0-9\s]', '', s)
     return s.strip()
 
-def get_column_confidence(df: pd.DataFrame, doc_type: str) -> float:
+def get_column_confidence(df: 'pd.DataFrame', doc_type: str) -> float:
     """
     Calcule un score de confiance basé sur la correspondance des noms de colonnes
     avec les modèles attendus pour le type de document.
@@ -695,12 +1018,64 @@ def detect_document_type_from_filename(filename: str) -> Dict[str, float]:
     
     return scores
 
-def scan_excel_content(filepath: str, deep_scan: bool = False) -> Dict[str, float]:
+def identify_from_filename(file_info: Dict) -> Dict:
+    """
+    Classe un fichier SharePoint sur son seul nom, au format des résultats de identify_sharepoint_files
+    
+    Args:
+        file_info: Fichier retourné par SharePointClient.list_files_in_folder
+        
+    Returns:
+        Dict: Fichier avec type, confiance et scores issus du nom
+    """
+    scores = detect_document_type_from_filename(file_info['name'])
+    best_type = max(scores, key=scores.get)
+    return {
+        'path': file_info['path'],
+        'name': file_info['name'],
+        'type': best_type,
+        'confidence': scores[best_type],
+        'scores': scores,
+        'size': file_info['size'],
+        'modified': file_info['modified'],
+        'created': file_info['created'],
+        'sharepoint_id': file_info['id'],
+        'web_url': file_info.get('web_url', ''),
+        'source': 'sharepoint'
+    }
+
+def summary_short_circuit(summary: Dict, min_confidence: float, max_files: Optional[int]) -> Optional[List[Dict]]:
+    """
+    Détermine si le résumé d'un dossier suffit à produire le résultat sans analyse complète :
+    dossier sans sous-dossier, au plus 2 × max_files fichiers Excel, et au moins max_files
+    fichiers déjà pertinents d'après leur nom.
+    
+    Args:
+        summary: Résumé retourné par SharePointClient.get_folders_summary
+        min_confidence: Score de confiance minimum
+        max_files: Nombre de fichiers visé (pas de raccourci si None)
+        
+    Returns:
+        Fichiers identifiés depuis le résumé, ou None si l'analyse complète reste nécessaire
+    """
+    if not max_files or summary.get('total_folders', 0) > 0:
+        return None
+    if summary.get('root_excel_files', 0) > max_files * 2:
+        return None
+    
+    candidates = [f for f in summary.get('sample_identified', []) if f['confidence'] >= min_confidence]
+    if len(candidates) < max_files:
+        return None
+    
+    candidates.sort(key=lambda f: f['confidence'], reverse=True)
+    return candidates[:max_files]
+
+def scan_excel_content(filepath: Union[str, io.BytesIO], deep_scan: bool = False) -> Dict[str, float]:
     """
     Analyse le contenu d'un fichier Excel pour détecter le type de document.
     
     Args:
-        filepath: Chemin vers le fichier Excel
+        filepath: Chemin vers le fichier Excel, ou son contenu déjà téléchargé en mémoire
         deep_scan: Si True, effectue une analyse plus approfondie (plus lente)
         
     Returns:
@@ -709,6 +1084,9 @@ def scan_excel_content(filepath: str, deep_scan: bool = False) -> Dict[str, floa
     scores = {'DPGF': 0.0, 'BPU': 0.0, 'DQE': 0.0}
     
     try:
+        # pandas/openpyxl importés à la demande : --summary et --test-access n'en ont pas besoin
+        import pandas as pd
+        
         # Lire uniquement les 100 premières lignes pour l'analyse rapide
         max_rows = None if deep_scan else 100
         df = pd.read_excel(filepath, nrows=max_rows, engine='openpyxl')
@@ -793,17 +1171,20 @@ class FileIdentifier:
     def init_sharepoint(self):
         """Initialise le client SharePoint"""
         if not self.sharepoint_client:
-            self.sharepoint_client = SharePointClient()
+            self.sharepoint_client = get_client()
     
     def identify_local_files(self, source_dir: str, exclude_dirs: Set[str] = None, 
-                           deep_scan: bool = False) -> List[Dict]:
+                           deep_scan: bool = False, max_workers: int = None) -> List[Dict]:
         """
         Identifie les fichiers pertinents dans un répertoire local.
+        Les fichiers sont analysés en parallèle dans un pool de processus
+        (directement, sans pool, en dessous de LOCAL_PARALLEL_MIN_FILES fichiers).
         
         Args:
             source_dir: Répertoire source
             exclude_dirs: Dossiers à exclure
             deep_scan: Analyse approfondie
+            max_workers: Nombre de processus d'analyse (défaut: nombre de CPU, borné par le nombre de fichiers)
             
         Returns:
             List[Dict]: Liste des fichiers identifiés avec leurs métadonnées
@@ -828,9 +1209,10 @@ class FileIdentifier:
         identified_files = []
         
         with tqdm(total=len(excel_files), desc="Analyse des fichiers") as pbar:
-            for filepath in excel_files:
+            def collect(filepath: str, get_result: Callable[[], Tuple[str, Dict[str, float], float]]):
+                """Ajoute le fichier aux résultats s'il atteint le score minimum"""
                 try:
-                    file_path, scores, max_score = analyze_file(filepath, deep_scan)
+                    file_path, scores, max_score = get_result()
                     
                     if max_score >= self.min_confidence:
                         best_type = max(scores, key=scores.get)
@@ -851,6 +1233,17 @@ class FileIdentifier:
                     logger.error(f"Erreur lors de l'analyse de {filepath}: {str(e)}")
                 
                 pbar.update(1)
+            
+            if len(excel_files) < LOCAL_PARALLEL_MIN_FILES:
+                # Peu de fichiers : démarrer des processus coûterait plus que l'analyse elle-même
+                for filepath in excel_files:
+                    collect(filepath, functools.partial(analyze_file, filepath, deep_scan))
+            else:
+                workers = min(len(excel_files), max_workers or os.cpu_count() or 1)
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {executor.submit(analyze_file, filepath, deep_scan): filepath for filepath in excel_files}
+                    for future in concurrent.futures.as_completed(futures):
+                        collect(futures[future], future.result)
         
         return identified_files
     
@@ -933,7 +1326,6 @@ class FileIdentifier:
             excel_files = excel_files[:self.max_files]
         
         identified_files = []
-        temp_dir = download_dir or tempfile.mkdtemp(prefix="sharepoint_analysis_")
         
         with tqdm(total=len(excel_files), desc="Analyse des fichiers SharePoint") as pbar:
             for file_info in excel_files:
@@ -945,18 +1337,16 @@ class FileIdentifier:
                     # Si l'analyse approfondie est demandée ou si le score du nom est prometteur
                     content_scores = {'DPGF': 0.0, 'BPU': 0.0, 'DQE': 0.0}
                     if deep_scan or max_filename_score >= self.min_confidence * 0.5:
-                        # Télécharger temporairement pour analyser le contenu
-                        temp_file_path = os.path.join(temp_dir, file_info['name'])
-                        
-                        if self.sharepoint_client.download_file(file_info['id'], temp_file_path):
-                            content_scores = scan_excel_content(temp_file_path, deep_scan)
-                            
-                            # Nettoyer le fichier temporaire si pas dans le dossier de téléchargement permanent
-                            if download_dir is None:
-                                try:
-                                    os.remove(temp_file_path)
-                                except:
-                                    pass
+                        if download_dir:
+                            # Conserver une copie locale dans le dossier de téléchargement demandé
+                            local_file_path = os.path.join(download_dir, file_info['name'])
+                            if self.sharepoint_client.download_file(file_info['id'], local_file_path):
+                                content_scores = scan_excel_content(local_file_path, deep_scan)
+                        else:
+                            # Analyse directe en mémoire : pas d'écriture ni de suppression sur disque
+                            buffer = self.sharepoint_client.download_to_buffer(file_info['id'])
+                            if buffer is not None:
+                                content_scores = scan_excel_content(buffer, deep_scan)
                     
                     # Combinaison des scores
                     combined_scores = {}
@@ -988,13 +1378,6 @@ class FileIdentifier:
                 
                 pbar.update(1)
         
-        # Nettoyer le répertoire temporaire si créé automatiquement
-        if download_dir is None:
-            try:
-                shutil.rmtree(temp_dir)
-            except:
-                pass
-        
         return identified_files
     
     def download_identified_files(self, identified_files: List[Dict], output_dir: str) -> List[Dict]:
@@ -1073,8 +1456,9 @@ def generate_report(identified_files: List[Dict], output_dir: str = "reports",
         formats = ['txt', 'csv']
     
     if output_basename is None:
+        # Suffixe aléatoire : deux analyses terminées dans la même seconde n'écrasent pas leurs rapports
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_basename = f"identified_files_{timestamp}"
+        output_basename = f"identified_files_{timestamp}_{uuid.uuid4().hex[:8]}"
     
     # Créer le répertoire de sortie
     output_dir_path = Path(output_dir)
@@ -1185,6 +1569,8 @@ def generate_report(identified_files: List[Dict], output_dir: str = "reports",
         xlsx_file = output_dir_path / f"{output_basename}.xlsx"
         
         try:
+            import pandas as pd
+            
             # Feuille principale avec les données
             df_files = pd.DataFrame(identified_files)
             
@@ -1243,10 +1629,7 @@ def auto_import_files(identified_files: List[Dict], import_script_path: str = No
             "../../import_dpgf_unified.py"
         ]
         
-        for path in possible_paths:
-            if Path(path).exists():
-                import_script_path = path
-                break
+        import_script_path = next((path for path in possible_paths if Path(path).exists()), None)
         
         if import_script_path is None:
             logger.error("❌ Script d'import non trouvé (import_complete.py ou import_dpgf_unified.py)")
@@ -1318,8 +1701,8 @@ def auto_import_files(identified_files: List[Dict], import_script_path: str = No
         logger.error(f"❌ Erreur lors du lancement de l'import: {str(e)}")
         return False
 
-def main():
-    """Fonction principale"""
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Construit le parseur d'arguments (réutilisable pour appeler run() sans sous-processus)"""
     parser = argparse.ArgumentParser(
         description="Identifier et analyser les fichiers DPGF/BPU/DQE depuis SharePoint ou un dossier local",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1336,6 +1719,13 @@ Exemples d'utilisation:
   
   # Export en multiple formats
   python identify_relevant_files_sharepoint.py --source sharepoint --formats txt,csv,json
+  
+  # Résumé + analyse rapide en un seul appel
+  python identify_relevant_files_sharepoint.py --source sharepoint --folder '/Dossier' --mode combined
+
+Quand l'exécution réussit (code de sortie 0), la dernière ligne de stdout est toujours
+"###RESULT### {json}" avec la liste "identified_files" (et "summary" en mode combined),
+lisible directement par un script appelant ; l'objet est vide pour --test-access et --summary.
         """
     )
     
@@ -1344,8 +1734,9 @@ Exemples d'utilisation:
                       help='Source des fichiers (sharepoint ou local)')
     parser.add_argument('--folder', type=str, default="/Documents partages",
                       help='Chemin du dossier SharePoint ou local')
-    parser.add_argument('--mode', choices=['quick', 'deep', 'download'], default='quick',
-                      help='Mode d\'analyse: quick (rapide), deep (approfondi), download (télécharger)')
+    parser.add_argument('--mode', choices=['quick', 'deep', 'download', 'combined'], default='quick',
+                      help='Mode d\'analyse: quick (rapide), deep (approfondi), download (télécharger), '
+                           'combined (résumé + analyse rapide en une seule exécution, résultat JSON sur stdout)')
     
     # Options d'analyse
     parser.add_argument('--min-confidence', type=float, default=0.3,
@@ -1361,9 +1752,13 @@ Exemples d'utilisation:
     parser.add_argument('--log-dir', type=str, default='logs',
                       help='Répertoire pour les logs (défaut: logs/)')
     parser.add_argument('--formats', type=str, default='txt,csv',
-                      help='Formats de rapport séparés par virgules: txt,csv,json,xlsx (défaut: txt,csv)')
+                      help='Formats de rapport séparés par virgules: txt,csv,json,xlsx (défaut: txt,csv). '
+                           'txt/csv sont destinés à une lecture humaine ; un script appelant '
+                           'peut se limiter à json (ou --no-disk-report) et lire la ligne ###RESULT###')
     parser.add_argument('--output-basename', type=str,
                       help='Nom de base pour les fichiers de sortie (auto-généré si omis)')
+    parser.add_argument('--no-disk-report', action='store_true',
+                      help='Ne pas écrire de rapport sur disque (résultat uniquement sur la ligne ###RESULT###)')
     
     # Options de téléchargement
     parser.add_argument('--download-folder', type=str, default='downloaded_dpgf',
@@ -1380,13 +1775,51 @@ Exemples d'utilisation:
                       help='Tester l\'accès SharePoint en listant les 10 premiers fichiers du dossier')
     parser.add_argument('--summary', action='store_true',
                       help='Afficher un résumé des dossiers avant l\'analyse complète')
+    parser.add_argument('--no-cache', action='store_true',
+                      help='Ignorer le cache local des résumés de dossiers (DPGF_CACHE_BUST=1 pour le vider)')
     
-    args = parser.parse_args()
+    # Appel par un script
+    parser.add_argument('--json-args', type=str, metavar='BASE64',
+                      help='Options en JSON encodé base64 ({"folder": ..., "max_files": ...}), '
+                           'utilisé seul à la place des autres arguments')
     
-    # Configuration du logging
-    global logger
-    logger = setup_logging(args.log_dir)
+    return parser
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Analyse les arguments de la ligne de commande.
+    Avec "--json-args <base64>", les options sont lues directement depuis le JSON
+    (noms des attributs argparse, ex: max_files) et complétées par les valeurs par défaut.
+    
+    Args:
+        argv: Arguments (sys.argv[1:] si None)
+        
+    Returns:
+        Namespace des options
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_arg_parser()
+    
+    if len(argv) == 2 and argv[0] == '--json-args':
+        args = parser.parse_args([])
+        vars(args).update(json.loads(base64.b64decode(argv[1])))
+        return args
+    
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> Dict:
+    """
+    Exécute l'identification dans le processus courant
     
+    Args:
+        args: Arguments issus de build_arg_parser().parse_args(...)
+        
+    Returns:
+        Dictionnaire résultat ("identified_files" et, en mode combined, "summary").
+        Vide pour --test-access et --summary qui ne produisent qu'un affichage.
+    """
     # Analyser les formats de sortie
     output_formats = [fmt.strip() for fmt in args.formats.split(',')]
     
@@ -1398,117 +1831,128 @@ Exemples d'utilisation:
     if args.max_files:
         logger.info(f"Limite fichiers: {args.max_files}")
     
-    try:
-        if args.source == 'sharepoint':
-            sharepoint_client = SharePointClient()
-            
-            # Test d'accès rapide
-            if args.test_access:
-                print(f"Test du dossier SharePoint: {args.folder}")
-                print("-" * 40)
-                try:
-                    first_files = sharepoint_client.list_first_10_files(args.folder)
-                    if first_files:
-                        print(f">> Acces reussi ! Trouve {len(first_files)} elements :")
+    if args.source == 'sharepoint':
+        sharepoint_client = get_client()
+        
+        # Test d'accès rapide
+        if args.test_access:
+            print(f"Test du dossier SharePoint: {args.folder}")
+            print("-" * 40)
+            try:
+                first_files = sharepoint_client.list_first_10_files(args.folder)
+                if first_files:
+                    print(f">> Acces reussi ! Trouve {len(first_files)} elements :")
+                    print()
+                    
+                    # Séparer les dossiers des fichiers
+                    folders = [f for f in first_files if f.get('type') == 'folder']
+                    files = [f for f in first_files if f.get('type') == 'file']
+                    
+                    # Afficher les dossiers d'abord
+                    if folders:
+                        print("Dossiers :")
+                        for i, folder_info in enumerate(folders, 1):
+                            modified_date = folder_info.get('modified', '')[:10] if folder_info.get('modified') else 'N/A'
+                            print(f"  {i:2d}. [DIR] {folder_info['name']} (modifie: {modified_date})")
                         print()
-                        
-                        # Séparer les dossiers des fichiers
-                        folders = [f for f in first_files if f.get('type') == 'folder']
-                        files = [f for f in first_files if f.get('type') == 'file']
-                        
-                        # Afficher les dossiers d'abord
-                        if folders:
-                            print("Dossiers :")
-                            for i, folder_info in enumerate(folders, 1):
-                                modified_date = folder_info.get('modified', '')[:10] if folder_info.get('modified') else 'N/A'
-                                print(f"  {i:2d}. [DIR] {folder_info['name']} (modifie: {modified_date})")
-                            print()
-                        
-                        # Afficher les fichiers
-                        if files:
-                            print("Fichiers :")
-                            excel_count = 0
-                            for i, file_info in enumerate(files, 1):
-                                size_str = f"{file_info['size']/1024/1024:.1f} MB" if file_info['size'] > 0 else "0 KB"
-                                modified_date = file_info.get('modified', '')[:10] if file_info.get('modified') else 'N/A'
-                                
-                                # Détecter les fichiers Excel
-                                is_excel = any(file_info['name'].lower().endswith(ext) for ext in EXCEL_EXTENSIONS)
-                                icon = "[XLS]" if is_excel else "[FILE]"
-                                if is_excel:
-                                    excel_count += 1
-                                
-                                print(f"  {i:2d}. {icon} {file_info['name']} ({size_str}, {modified_date})")
+                    
+                    # Afficher les fichiers
+                    if files:
+                        print("Fichiers :")
+                        excel_count = 0
+                        for i, file_info in enumerate(files, 1):
+                            size_str = f"{file_info['size']/1024/1024:.1f} MB" if file_info['size'] > 0 else "0 KB"
+                            modified_date = file_info.get('modified', '')[:10] if file_info.get('modified') else 'N/A'
                             
-                            if excel_count > 0:
-                                print(f"\n!! {excel_count} fichier(s) Excel detecte(s) - potentiellement analysables")
-                        
-                        print("\nPour analyser ces fichiers, utilisez :")
-                        print(f"  python {Path(__file__).name} --source sharepoint --folder '{args.folder}' --mode quick")
+                            # Détecter les fichiers Excel
+                            is_excel = any(file_info['name'].lower().endswith(ext) for ext in EXCEL_EXTENSIONS)
+                            icon = "[XLS]" if is_excel else "[FILE]"
+                            if is_excel:
+                                excel_count += 1
+                            
+                            print(f"  {i:2d}. {icon} {file_info['name']} ({size_str}, {modified_date})")
                         
-                    else:
-                        print("XX Aucun element trouve ou acces impossible")
-                        print("!! Verifiez le chemin du dossier ou vos permissions")
-                    return
-                except Exception as e:
-                    print(f"XX Erreur lors du test d'acces: {str(e)}")
-                    return
+                        if excel_count > 0:
+                            print(f"\n!! {excel_count} fichier(s) Excel detecte(s) - potentiellement analysables")
+                    
+                    print("\nPour analyser ces fichiers, utilisez :")
+                    print(f"  python {Path(__file__).name} --source sharepoint --folder '{args.folder}' --mode quick")
+                    
+                else:
+                    print("XX Aucun element trouve ou acces impossible")
+                    print("!! Verifiez le chemin du dossier ou vos permissions")
+                return {}
+            except Exception as e:
+                print(f"XX Erreur lors du test d'acces: {str(e)}")
+                return {}
+        
+        # Résumé des dossiers (pour dossier racine uniquement)
+        if args.summary and args.folder == "/":
+            print(f"📊 Résumé des dossiers SharePoint: {args.folder}")
+            print("-" * 50)
             
-            # Résumé des dossiers (pour dossier racine uniquement)
-            if args.summary and args.folder == "/":
-                print(f"📊 Résumé des dossiers SharePoint: {args.folder}")
-                print("-" * 50)
-                
-                summary = sharepoint_client.get_folders_summary(args.folder)
-                
-                print(f"📁 Total des dossiers: {summary['total_folders']}")
-                print(f"📈 Estimation des fichiers: ~{summary['estimated_files']:,}")
-                print()
-                
-                if summary['folders']:
-                    print("🔍 Aperçu des premiers dossiers:")
-                    for i, folder_info in enumerate(summary['folders'], 1):
-                        excel_info = f"({folder_info['excel_files']} Excel)" if folder_info['excel_files'] > 0 else "(pas d'Excel)"
-                        print(f"  {i}. 📁 {folder_info['name']}")
-                        print(f"     └─ {folder_info['sample_files']} fichiers échantillonnés {excel_info}")
-                
-                print(f"\n💡 Pour analyser tous les dossiers, utilisez :")
-                print(f"  python {Path(__file__).name} --source sharepoint --folder '/' --mode quick")
-                print(f"\n⚠️  ATTENTION: Avec {summary['total_folders']} dossiers, l'analyse complète peut prendre du temps.")
-                print(f"  Utilisez --max-files pour limiter ou --summary pour estimer.")
-                return
+            summary = sharepoint_client.get_folders_summary(args.folder, use_cache=not args.no_cache)
             
-            # Initialiser l'identificateur avec les nouvelles options
-            identifier = FileIdentifier(
-                min_confidence=args.min_confidence,
-                max_files=args.max_files
-            )
+            print(f"📁 Total des dossiers: {summary['total_folders']}")
+            print(f"📈 Estimation des fichiers: ~{summary['estimated_files']:,}")
+            print()
             
-            # Scan des fichiers
-            print(f">> Scan des fichiers depuis SharePoint: {args.folder}")
+            if summary['folders']:
+                print("🔍 Aperçu des premiers dossiers:")
+                for i, folder_info in enumerate(summary['folders'], 1):
+                    excel_info = f"({folder_info['excel_files']} Excel)" if folder_info['excel_files'] > 0 else "(pas d'Excel)"
+                    print(f"  {i}. 📁 {folder_info['name']}")
+                    print(f"     └─ {folder_info['sample_files']} fichiers échantillonnés {excel_info}")
             
-            if args.mode == 'download':
-                # Mode téléchargement
-                identified_files = identifier.identify_sharepoint_files(
-                    f"https://sef92230.sharepoint.com/sites/etudes{args.folder}",
-                    deep_scan=args.deep_scan or args.mode == 'deep',
-                    download_dir=args.download_folder
+            print(f"\n💡 Pour analyser tous les dossiers, utilisez :")
+            print(f"  python {Path(__file__).name} --source sharepoint --folder '/' --mode quick")
+            print(f"\n⚠️  ATTENTION: Avec {summary['total_folders']} dossiers, l'analyse complète peut prendre du temps.")
+            print(f"  Utilisez --max-files pour limiter ou --summary pour estimer.")
+            return {}
+        
+        # Initialiser l'identificateur avec les nouvelles options
+        identifier = FileIdentifier(
+            min_confidence=args.min_confidence,
+            max_files=args.max_files
+        )
+        
+        # Scan des fichiers
+        print(f">> Scan des fichiers depuis SharePoint: {args.folder}")
+        
+        if args.mode == 'download':
+            # Mode téléchargement
+            identified_files = identifier.identify_sharepoint_files(
+                f"https://sef92230.sharepoint.com/sites/etudes{args.folder}",
+                deep_scan=args.deep_scan or args.mode == 'deep',
+                download_dir=args.download_folder
+            )
+            
+            if identified_files:
+                # Télécharger les fichiers identifiés
+                downloaded_files = identifier.download_identified_files(
+                    identified_files, args.download_folder
                 )
                 
-                if identified_files:
-                    # Télécharger les fichiers identifiés
-                    downloaded_files = identifier.download_identified_files(
-                        identified_files, args.download_folder
-                    )
-                    
-                    # Utiliser les fichiers téléchargés pour le rapport
-                    final_files = downloaded_files
-                    
-                    # Import automatique si demandé
-                    if args.auto_import:
-                        auto_import_files(downloaded_files, args.import_script)
-                else:
-                    final_files = []
+                # Utiliser les fichiers téléchargés pour le rapport
+                final_files = downloaded_files
+                
+                # Import automatique si demandé
+                if args.auto_import:
+                    auto_import_files(downloaded_files, args.import_script)
+            else:
+                final_files = []
+        else:
+            # Mode combiné : le résumé est calculé d'abord ; pour un petit dossier sans
+            # sous-dossier où il suffit déjà à atteindre --max-files, l'analyse complète est évitée.
+            # Le résumé est recalculé (pas de cache) : les fichiers retournés doivent exister maintenant.
+            sample_files = None
+            if args.mode == 'combined':
+                combined_summary = sharepoint_client.get_folders_summary(args.folder, use_cache=False)
+                sample_files = summary_short_circuit(combined_summary, args.min_confidence, args.max_files)
+            
+            if sample_files is not None:
+                print(f">> Resume suffisant: {len(sample_files)} fichiers identifies sur leur nom, analyse complete ignoree")
+                final_files = sample_files
             else:
                 # Mode analyse seulement
                 identified_files = identifier.identify_sharepoint_files(
@@ -1516,47 +1960,63 @@ Exemples d'utilisation:
                     deep_scan=args.deep_scan or args.mode == 'deep'
                 )
                 final_files = identified_files
+    
+    else:  # source == 'local'
+        identifier = FileIdentifier(
+            min_confidence=args.min_confidence,
+            max_files=args.max_files
+        )
         
-        else:  # source == 'local'
-            identifier = FileIdentifier(
-                min_confidence=args.min_confidence,
-                max_files=args.max_files
-            )
-            
-            print(f">> Scan des fichiers locaux: {args.folder}")
-            
-            identified_files = identifier.identify_local_files(
-                args.folder,
-                deep_scan=args.deep_scan or args.mode == 'deep'
-            )
-            final_files = identified_files
-            
-            # Import automatique si demandé
-            if args.auto_import:
-                auto_import_files(identified_files, args.import_script)
-        
-        # Générer les rapports
-        if final_files:
-            report_files = generate_report(
-                final_files,
-                output_dir=args.reports_dir,
-                output_basename=args.output_basename,
-                formats=output_formats
-            )
-            
-            print(f"\n>> Analyse terminee!")
-            print(f">> {len(final_files)} fichiers identifies")
-            print(f">> Rapports generes: {len(report_files)}")
-            
-            # Afficher les chemins des rapports
-            for report_file in report_files:
-                print(f"  • {report_file}")
-                
-            if args.auto_import and final_files:
-                print(f">> Import automatique {'termine' if args.mode == 'download' else 'lance'}")
-        else:
-            print("XX Aucun fichier identifie correspondant aux criteres")
+        print(f">> Scan des fichiers locaux: {args.folder}")
+        
+        identified_files = identifier.identify_local_files(
+            args.folder,
+            deep_scan=args.deep_scan or args.mode == 'deep'
+        )
+        final_files = identified_files
+        
+        # Import automatique si demandé
+        if args.auto_import:
+            auto_import_files(identified_files, args.import_script)
+    
+    # Générer les rapports
+    if final_files and not args.no_disk_report:
+        report_files = generate_report(
+            final_files,
+            output_dir=args.reports_dir,
+            output_basename=args.output_basename,
+            formats=output_formats
+        )
+        
+        print(f"\n>> Analyse terminee!")
+        print(f">> {len(final_files)} fichiers identifies")
+        print(f">> Rapports generes: {len(report_files)}")
+        
+        # Afficher les chemins des rapports
+        for report_file in report_files:
+            print(f"  • {report_file}")
             
+        if args.auto_import and final_files:
+            print(f">> Import automatique {'termine' if args.mode == 'download' else 'lance'}")
+    elif not final_files:
+        print("XX Aucun fichier identifie correspondant aux criteres")
+    
+    result_payload = {"identified_files": final_files}
+    if args.source == 'sharepoint' and args.mode == 'combined':
+        result_payload["summary"] = combined_summary
+    return result_payload
+
+
+def main():
+    """Fonction principale"""
+    args = parse_arguments()
+    
+    # Configuration du logging
+    global logger
+    logger = setup_logging(args.log_dir)
+    
+    try:
+        result_payload = run(args)
     except KeyboardInterrupt:
         print("\n>> Analyse interrompue par l'utilisateur")
         return 1
@@ -1568,6 +2028,10 @@ Exemples d'utilisation:
             print(f"\nXX Erreur inattendue: {str(e)}")
         return 1
     
+    # Résultat sur la dernière ligne de stdout (évite la relecture du rapport JSON par l'appelant),
+    # émis même vide pour que l'appelant ne se rabatte pas sur la sortie texte
+    print(RESULT_SENTINEL + json.dumps(result_payload or {}, ensure_ascii=False, default=str), flush=True)
+    
     return 0
 
 if __name__ == "__main__":
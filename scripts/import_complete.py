@@ -18,6 +18,7 @@ import re
 import hashlib
 import pickle
 import csv
+from functools import lru_cache
 from typing import Optional, Dict, List, Tuple, Generator
 from datetime import date
 from pathlib import Path
@@ -70,6 +71,15 @@ except ImportError:
     SHAREPOINT_HELPER_AVAILABLE = False
     print("⚠️ Module sharepoint_import_helper non disponible. Le support optimisé pour SharePoint ne sera pas utilisé.")
 
+# Import du cache persistant des réponses Gemini
+try:
+    from scripts.gemini_cache import GeminiResponseCache
+except ImportError:
+    try:
+        from gemini_cache import GeminiResponseCache
+    except ImportError:
+        GeminiResponseCache = None
+
 # Import conditionnel de l'API Gemini
 try:
     import google.generativeai as genai
@@ -84,6 +94,10 @@ if sys.platform.startswith('win'):
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
+# Réponses acceptées lors de la confirmation interactive du mapping
+YES_ANSWERS = frozenset({'o', 'oui', 'y', 'yes'})
+NO_ANSWERS = frozenset({'n', 'non', 'no'})
+
 
 class ImportStats:
     """Statistiques d'import"""
@@ -202,11 +216,11 @@ class ColumnMapping:
         
         # Demander confirmation
         while True:
-            confirm = input("\nConfirmer ce mapping? (o/n): ")
+            confirm = input("\nConfirmer ce mapping? (o/n): ").strip().lower()
 
-            if confirm.lower() in ['o', 'oui', 'y', 'yes']:
+            if confirm in YES_ANSWERS:
                 return mapping
-            elif confirm.lower() in ['n', 'non', 'no']:
+            elif confirm in NO_ANSWERS:
                 print("Mapping annulé, recommencer...")
                 return self.interactive_mapping(headers)
             else:
@@ -262,33 +276,54 @@ class ErrorReporter:
         self.errors.clear()
 
 
+# Patterns de détection du client, compilés une seule fois au chargement du module
+# Client dans le nom de fichier
+CLIENT_FILENAME_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'DPGF[_\-\s]*([A-Z][A-Za-z\s&\'\.]+?)[_\-\s]*Lot',
+    r'([A-Z][A-Za-z\s&\'\.]+?)[\-_\s]*DPGF',
+    r'Client[_\-\s]*([A-Z][A-Za-z\s&\'\.]+)',
+    r'([A-Z]{2,}[\s&][A-Z\s\'\.]+)',  # Acronymes + mots
+    r'^((?:[A-Z][a-zA-Z\'\.]+\s*)+)',  # Séquence de mots capitalisés au début
+    r'[\\/]([A-Z][A-Za-z\s&\'\.]+?)[\\/][^\\\/]+\.xlsx$', # Client dans le chemin du dossier
+    r'(?:projet|chantier)[_\-\s]+([A-Z][A-Za-z\s&\'\.]+)',  # Pattern après "projet" ou "chantier"
+    r'_([A-Z][a-z]{2,}(?:[A-Z][a-z]+)+)_', # Nom en camelCase entouré de underscores
+]]
+
+# Client dans le contenu (lignes d'en-tête)
+CLIENT_CONTENT_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'(?:client|maître d\'ouvrage|maitre d\'ouvrage|donneur d\'ordre)[^\w\n]{1,5}([A-Z][A-Za-z\s&\'\.]{2,})',
+    r'(?:pour|destiné à|réalisé pour)[^\w\n]{1,5}([A-Z][A-ZaZ\s&\'\.]{2,})',
+    r'(?:société|entreprise|groupe)[^\w\n]{1,5}([A-Z][A-ZaZ\s&\'\.]{2,})',
+    r'^([A-Z][A-z]+(?:[\s\-][A-Z][A-z]+){1,3})\s*$', # Ligne avec uniquement un nom capitalisé
+    r'Projet\s*(?:pour|de|avec)?\s*(?:la|le)?\s*([A-Z][A-Za-z\s&\'\.]{2,})',
+    r'Chantier\s*(?:de|pour)?\s*([A-Z][A-ZaZ\s&\'\.]{2,})',
+    r'(?:SA|SAS|SARL|GROUP|HABITAT)\s+([A-Z][A-ZaZ\s&\'\.]{2,})',
+    r'([A-Z][A-ZaZ\s&\'\.]{2,})\s+(?:SA|SAS|SARL|GROUP|HABITAT)'
+]]
+
+# Client dans le texte d'une cellule (sensible à la casse)
+CLIENT_TEXT_PATTERNS = [re.compile(pattern) for pattern in [
+    r'^([A-Z]{2,}(?:\s+[A-Z&\'\.]+)*)\s*$',  # Acronymes en majuscules
+    r'([A-Z][a-z]+(?:\s+[A-Z][a-z\'\.]+)*)\s*(?:HABITAT|GROUP|COMPANY|SA|SAS|SARL|SCI|IMMOBILIER)',
+    r'((?:[A-Z]{2,}\s*)+)(?:HABITAT|GROUP|IMMOBILIER)',  # CDC HABITAT, BNP GROUP, etc.
+    r'(?:^|\s)([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){1,3})(?:\s|$)',  # Mots capitalisés (2-4 mots)
+    r'(?:^|\s)([A-Z]{2,}(?:\s*[A-Z]{2,}){0,2})(?:\s|$)',  # Acronymes 2-3 lettres
+    r'(?:société|entreprise|groupe|client|constructeur)\s+([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){0,3})',
+    r'[Pp]our\s+(?:le\s+compte\s+de\s+)?([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){0,3})',
+    r'[Aa]dresse\s*:?\s*(?:[^,]+,\s*)?([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){1,3})',
+    r'(?:^|\n)\s*([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){1,2})\s*(?:$|\n)', # Nom isolé sur une ligne
+]]
+
+
 class ClientDetector:
     """Détecteur automatique du nom du client"""
     
     def __init__(self):
         # Patterns pour extraire le client du nom de fichier
-        self.filename_patterns = [
-            r'DPGF[_\-\s]*([A-Z][A-Za-z\s&\'\.]+?)[_\-\s]*Lot',
-            r'([A-Z][A-Za-z\s&\'\.]+?)[\-_\s]*DPGF',
-            r'Client[_\-\s]*([A-Z][A-Za-z\s&\'\.]+)',
-            r'([A-Z]{2,}[\s&][A-Z\s\'\.]+)',  # Acronymes + mots
-            r'^((?:[A-Z][a-zA-Z\'\.]+\s*)+)',  # Séquence de mots capitalisés au début
-            r'[\\/]([A-Z][A-Za-z\s&\'\.]+?)[\\/][^\\\/]+\.xlsx$', # Client dans le chemin du dossier
-            r'(?:projet|chantier)[_\-\s]+([A-Z][A-Za-z\s&\'\.]+)',  # Pattern après "projet" ou "chantier"
-            r'_([A-Z][a-z]{2,}(?:[A-Z][a-z]+)+)_', # Nom en camelCase entouré de underscores
-        ]
+        self.filename_patterns = CLIENT_FILENAME_PATTERNS
         
         # Patterns pour détecter un client dans le contenu
-        self.content_patterns = [
-            r'(?:client|maître d\'ouvrage|maitre d\'ouvrage|donneur d\'ordre)[^\w\n]{1,5}([A-Z][A-Za-z\s&\'\.]{2,})',
-            r'(?:pour|destiné à|réalisé pour)[^\w\n]{1,5}([A-Z][A-ZaZ\s&\'\.]{2,})',
-            r'(?:société|entreprise|groupe)[^\w\n]{1,5}([A-Z][A-ZaZ\s&\'\.]{2,})',
-            r'^([A-Z][A-z]+(?:[\s\-][A-Z][A-z]+){1,3})\s*$', # Ligne avec uniquement un nom capitalisé
-            r'Projet\s*(?:pour|de|avec)?\s*(?:la|le)?\s*([A-Z][A-Za-z\s&\'\.]{2,})',
-            r'Chantier\s*(?:de|pour)?\s*([A-Z][A-ZaZ\s&\'\.]{2,})',
-            r'(?:SA|SAS|SARL|GROUP|HABITAT)\s+([A-Z][A-ZaZ\s&\'\.]{2,})',
-            r'([A-Z][A-ZaZ\s&\'\.]{2,})\s+(?:SA|SAS|SARL|GROUP|HABITAT)'
-        ]
+        self.content_patterns = CLIENT_CONTENT_PATTERNS
         
         # Mots-clés à ignorer dans la détection
         self.ignore_words = {'LOT', 'DPGF', 'NOVEMBRE', 'DECEMBRE', 'JANVIER', 'FEVRIER', 'MARS', 'AVRIL', 'MAI', 'JUIN', 
@@ -303,7 +338,7 @@ class ClientDetector:
         print(f"Analyse du nom de fichier: {filename}")
         
         for pattern in self.filename_patterns:
-            match = re.search(pattern, filename, re.IGNORECASE)
+            match = pattern.search(filename)
             if match:
                 client_name = match.group(1).strip()
                 # Nettoyer et valider
@@ -317,19 +352,17 @@ class ClientDetector:
     def detect_from_excel_header(self, file_path: str) -> Optional[str]:
         """Détecte le client dans les 15 premières lignes du fichier Excel"""
         try:
-            # Détection automatique du moteur Excel selon l'extension
-            engine = detect_excel_engine(file_path)
             # Lire seulement les premières lignes (augmenté à 15 pour une meilleure couverture)
-            df = pd.read_excel(file_path, engine=engine, nrows=15, header=None)
+            rows = read_top_rows(file_path, 15)
             
             print("Analyse des premières lignes du fichier...")
             
             # 1. D'abord chercher des mots-clés spécifiques comme "Client:", "Maître d'ouvrage:"
-            for row_idx in range(min(15, len(df))):
-                row_text = " ".join([str(val).strip() for val in df.iloc[row_idx].values if pd.notna(val)])
+            for row_idx, row in enumerate(rows):
+                row_text = " ".join([val for val in row if val])
                 
                 for pattern in self.content_patterns:
-                    match = re.search(pattern, row_text, re.IGNORECASE)
+                    match = pattern.search(row_text)
                     if match:
                         client_name = match.group(1).strip()
                         client_name = self._clean_client_name(client_name)
@@ -338,13 +371,9 @@ class ClientDetector:
                             return client_name
             
             # 2. Chercher dans toutes les cellules des premières lignes
-            for row_idx in range(min(15, len(df))):
-                for col_idx in range(min(8, len(df.columns))):  # Augmenté à 8 colonnes
-                    cell_value = df.iloc[row_idx, col_idx]
-                    
-                    if pd.notna(cell_value):
-                        cell_text = str(cell_value).strip()
-                        
+            for row_idx, row in enumerate(rows):
+                for col_idx, cell_text in enumerate(row[:8]):  # Augmenté à 8 colonnes
+                    if cell_text:
                         # Chercher des patterns de nom de client
                         client = self._extract_client_from_text(cell_text)
                         if client:
@@ -359,8 +388,8 @@ class ClientDetector:
                 "LECLERC", "AUCHAN", "LEROY MERLIN", "CASTORAMA", "LIDL", "ALDI", "COLAS"
             ]
             
-            for row_idx in range(min(15, len(df))):
-                row_text = " ".join([str(val).strip() for val in df.iloc[row_idx].values if pd.notna(val)])
+            for row_idx, row in enumerate(rows):
+                row_text = " ".join([val for val in row if val])
                 for company in known_companies:
                     if company in row_text.upper():
                         print(f"Entreprise connue détectée (ligne {row_idx}): {company}")
@@ -373,22 +402,9 @@ class ClientDetector:
             
     def _extract_client_from_text(self, text: str) -> Optional[str]:
         """Extrait un nom de client depuis un texte"""
-        # Patterns pour identifier un client
-        client_patterns = [
-            r'^([A-Z]{2,}(?:\s+[A-Z&\'\.]+)*)\s*$',  # Acronymes en majuscules
-            r'([A-Z][a-z]+(?:\s+[A-Z][a-z\'\.]+)*)\s*(?:HABITAT|GROUP|COMPANY|SA|SAS|SARL|SCI|IMMOBILIER)',
-            r'((?:[A-Z]{2,}\s*)+)(?:HABITAT|GROUP|IMMOBILIER)',  # CDC HABITAT, BNP GROUP, etc.
-            r'(?:^|\s)([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){1,3})(?:\s|$)',  # Mots capitalisés (2-4 mots)
-            r'(?:^|\s)([A-Z]{2,}(?:\s*[A-Z]{2,}){0,2})(?:\s|$)',  # Acronymes 2-3 lettres
-            r'(?:société|entreprise|groupe|client|constructeur)\s+([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){0,3})',
-            r'[Pp]our\s+(?:le\s+compte\s+de\s+)?([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){0,3})',
-            r'[Aa]dresse\s*:?\s*(?:[^,]+,\s*)?([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){1,3})',
-            r'(?:^|\n)\s*([A-Z][a-zA-Z\'\.]+(?:\s+[A-Z][a-zA-Z\'\.]+){1,2})\s*(?:$|\n)', # Nom isolé sur une ligne
-        ]
-        
         text = text.strip()
-        for pattern in client_patterns:
-            match = re.search(pattern, text)
+        for pattern in CLIENT_TEXT_PATTERNS:
+            match = pattern.search(text)
             if match:
                 client_name = match.group(1).strip()
                 client_name = self._clean_client_name(client_name)
@@ -517,6 +533,66 @@ def detect_excel_engine(file_path: str) -> str:
         return 'openpyxl'
 
 
+# Nombre de fichiers dont les premières lignes restent en mémoire
+# (partagées entre détection du client et du lot)
+TOP_ROWS_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=TOP_ROWS_CACHE_SIZE)
+def _read_top_rows_cached(file_path: str, mtime_ns: int, size: int, n: int) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Lecture effective des premières lignes, mise en cache : mtime_ns et size font
+    partie de la clé, un fichier modifié est donc relu.
+    
+    Args:
+        file_path: Chemin absolu du fichier Excel
+        mtime_ns: Date de modification du fichier (os.stat().st_mtime_ns)
+        size: Taille du fichier en octets
+        n: Nombre de lignes à lire
+        
+    Returns:
+        Lignes lues (tuples de chaînes)
+    """
+    rows = []
+    if detect_excel_engine(file_path) == 'openpyxl':
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            for values in ws.iter_rows(max_row=n, values_only=True):
+                rows.append(tuple("" if val is None else str(val).strip() for val in values))
+        finally:
+            wb.close()
+    else:
+        # Les fichiers .xls ne sont pas lisibles en streaming par openpyxl
+        df = pd.read_excel(file_path, engine=detect_excel_engine(file_path), nrows=n, header=None)
+        for values in df.itertuples(index=False):
+            rows.append(tuple(str(val).strip() if pd.notna(val) else "" for val in values))
+    return tuple(rows)
+
+
+def read_top_rows(file_path: str, n: int = 15) -> List[List[str]]:
+    """
+    Lit les n premières lignes de la première feuille sans charger tout le classeur
+    (openpyxl en lecture seule). Les cellules vides valent "".
+    Le résultat est mis en cache (TOP_ROWS_CACHE_SIZE fichiers au plus).
+    
+    Args:
+        file_path: Chemin vers le fichier Excel
+        n: Nombre de lignes à lire
+        
+    Returns:
+        Liste de lignes (liste de chaînes)
+    """
+    stat = os.stat(file_path)
+    rows = _read_top_rows_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, n)
+    return [list(row) for row in rows]
+
+
+# Intitulé de lot dans le contenu du fichier (ex: "LOT 06 - METALLERIE")
+LOT_CONTENT_PATTERN = re.compile(r'lot\s+([^\s–-]+)\s*[–-]\s*(.+)', re.IGNORECASE)
+
+
 class GeminiCache:
     """Cache intelligent pour les réponses Gemini"""
     
@@ -563,6 +639,110 @@ class GeminiCache:
         self._save_cache()
 
 
+# Patterns renforcés pour détecter un lot dans le nom de fichier (ordre de priorité),
+# compilés une seule fois au chargement du module
+LOT_FILENAME_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # === PATTERNS STANDARDS ===
+    # LOT 06 - DPGF - METALLERIE (très spécifique)
+    r'lot\s*(\d{1,2})\s*-\s*(?:dpgf|devis|bpu|dqe)\s*-\s*([\w\s\-&°\'\.]+)',
+    
+    # DPGF-Lot 06 Métallerie (avec tiret)
+    r'dpgf\s*[-_]?\s*lot\s*(\d{1,2})\s+([\w\s\-&°\'\.]+)',
+    
+    # LOT 06 - METALLERIE (avec tiret et nom)
+    r'lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
+    
+    # === PATTERNS COMPLEXES ===
+    # 802 DPGF Lot 2 - Curage (numéro au début + lot)
+    r'^\d+\s+dpgf\s+lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
+    
+    # DPGF Lot 6 - Métallerie
+    r'dpgf\s+lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
+    
+    # Lot06_Métallerie ou Lot 06 Métallerie
+    r'lot\s*(\d{1,2})[_\-\s]+([\w\s\-&°\'\.]+)',
+    
+    # === PATTERNS SHAREPOINT ET ENTREPRISES ===
+    # 25S012 - DPGF -Lot4 (pattern spécial SharePoint)
+    r'-\s*dpgf\s*-?\s*lot\s*(\d{1,2})\s*-?\s*([\w\s\-&°\'\.]*)',
+    
+    # [Entreprise] - Lot 03 - Nom du lot
+    r'[\[\(][\w\s]+[\]\)]\s*-\s*lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
+    
+    # === PATTERNS AVEC PRÉFIXES ===
+    # DCE_Lot_06_Metallerie
+    r'(?:dce|bce|appel|marche|projet)[-_\s]*lot[-_\s]*(\d{1,2})[-_\s]+([\w\s\-&°\'\.]+)',
+    
+    # Chantier_Nom_Lot06_Description
+    r'(?:chantier|projet|travaux)[-_\s]*[\w\s]*[-_\s]*lot[-_\s]*(\d{1,2})[-_\s]+([\w\s\-&°\'\.]+)',
+    
+    # === PATTERNS AVEC CODES CLIENTS ===
+    # CDC_HABITAT_LOT_6_METALLERIE
+    r'(?:cdc|bnp|axa|vinci|bouygues)[-_\s]*(?:habitat|group|immobilier)?[-_\s]*lot[-_\s]*(\d{1,2})[-_\s]+([\w\s\-&°\'\.]+)',
+    
+    # === PATTERNS ALTERNATIFS ===
+    # LOT6 - Description (collé)
+    r'lot(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
+    
+    # Lot_6_Description (avec underscores)
+    r'lot[-_](\d{1,2})[-_]([\w\s\-&°\'\.]+)',
+    
+    # 06_METALLERIE_LOT (inversé)
+    r'(\d{1,2})[-_\s]*([\w\s\-&°\'\.]+)[-_\s]*lot',
+    
+    # === PATTERNS MINIMALISTES ===
+    # Lot6 (juste numéro, sans description)
+    r'lot\s*(\d{1,2})(?!\d)(?:[^\w\d]|$)',  # Éviter lot123
+    
+    # L06, L6 (format abrégé)
+    r'\bL(\d{1,2})\b',
+    
+    # 6-METALLERIE (sans "lot")
+    r'^(\d{1,2})\s*-\s*([\w\s\-&°\'\.]{5,})',
+    
+    # === PATTERNS DANS LE CHEMIN ===
+    # Chercher aussi dans le chemin du fichier
+    r'[\\/]lot[-_\s]*(\d{1,2})[-_\s]*([\w\s\-&°\'\.]*)',
+]]
+LOT_PATH_PATTERN = re.compile(r'[\\/]lot[-_\s]*(\d{1,2})[-_\s]*([\w\s\-&°\'\.]*)', re.IGNORECASE)
+LOT_DIGITS_PATTERN = re.compile(r'(\d{1,2})')
+
+
+# Patterns d'en-tête pour chaque type de colonne
+COLUMN_HEADER_PATTERNS = {name: [re.compile(pattern, re.IGNORECASE) for pattern in patterns] for name, patterns in {
+    'designation': [r'désignation', r'designation', r'libellé', r'libelle', r'description', r'prestation', r'article', r'détail', r'detail', r'ouvrage', r'intitulé', r'intitule', r'nature'],
+    'unite': [r'unité', r'unite', r'u\.?$', r'un\.?$', r'un$', r'unité de mesure', r'mesure', r'^u$'],
+    'quantite': [r'quantité', r'quantite', r'qté\.?', r'qt\.?', r'quant\.?', r'qte'],
+    'prix_unitaire': [r'prix\s*(?:unitaire|unit\.?)(?:\s*h\.?t\.?)?', r'p\.u\.(?:\s*h\.?t\.?)?', r'pu(?:\s*h\.?t\.?)?', r'pu\s*ht$', r'prix\s*ht$'],
+    'prix_total': [r'prix\s*(?:total|tot\.?)(?:\s*h\.?t\.?)?', r'montant(?:\s*h\.?t\.?)?', r'p\.t\.(?:\s*h\.?t\.?)?', r'pt(?:\s*h\.?t\.?)?', r'total(?:\s*h\.?t\.?)?']
+}.items()}
+
+
+@lru_cache(maxsize=256)
+def match_header_columns(header_row: Tuple[str, ...]) -> Tuple[Tuple[str, Optional[int]], ...]:
+    """
+    Associe chaque type de colonne au premier indice d'en-tête correspondant.
+    Fonction pure de la ligne d'en-tête : les feuilles partageant les mêmes
+    en-têtes ne sont analysées qu'une seule fois.
+    
+    Args:
+        header_row: Cellules de la ligne d'en-tête (en minuscules)
+        
+    Returns:
+        Tuple de paires (type_colonne, indice ou None)
+    """
+    matches = []
+    for col_name, col_patterns in COLUMN_HEADER_PATTERNS.items():
+        found = None
+        for col_idx, cell_text in enumerate(header_row):
+            cell_text = cell_text.lower()
+            if any(pattern.search(cell_text) for pattern in col_patterns):
+                found = col_idx
+                break
+        matches.append((col_name, found))
+    return tuple(matches)
+
+
 class ExcelParser:
     """Analyse les fichiers Excel DPGF avec détection de colonnes améliorée
     et support spécifique pour les formats SharePoint"""
@@ -723,12 +903,14 @@ class ExcelParser:
         # === DÉTECTION DE VALEURS NUMÉRIQUES ===
         # Compter les colonnes avec beaucoup de valeurs numériques (prix, quantités)
         numeric_columns = 0
-        for col in range(min(10, df.shape[1])):
+        # Fenêtre 20x10 extraite une seule fois en ndarray (évite un iloc par cellule)
+        window = df.iloc[:20, :10].to_numpy(dtype=object)
+        for column_values in window.T:
             numeric_count = 0
-            for row in range(min(20, df.shape[0])):
+            for value in column_values:
                 try:
-                    if pd.notna(df.iloc[row, col]):
-                        val = str(df.iloc[row, col]).replace(',', '.')
+                    if pd.notna(value):
+                        val = str(value).replace(',', '.')
                         float(val)
                         numeric_count += 1
                 except (ValueError, TypeError):
@@ -803,26 +985,22 @@ class ExcelParser:
         
         # Priorité 3: Méthode classique - analyser le contenu du fichier
         self.logger.info("Méthode 3: Analyse classique du contenu")
-        pattern = re.compile(r'lot\s+([^\s–-]+)\s*[–-]\s*(.+)', re.IGNORECASE)
-        
-        # Parcourir les 15 premières lignes
-        self.logger.debug(f"Recherche dans les {min(15, len(self.df))} premières lignes du fichier")
-        for i in range(min(15, len(self.df))):
-            for col in range(len(self.df.columns)):
-                if col < len(self.df.columns):  # Vérification de sécurité
-                    cell_value = self.df.iloc[i, col]
-                    if pd.notna(cell_value):
-                        cell_str = str(cell_value).strip()
-                        match = pattern.search(cell_str)
-                        if match:
-                            numero_lot = match.group(1).strip()
-                            nom_lot = match.group(2).strip()
-                            lot_info = (numero_lot, nom_lot)
-                            self.logger.log_lot_detection("content", True, lot_info, 
-                                                         pattern=r'lot\s+([^\s–-]+)\s*[–-]\s*(.+)',
-                                                         error=f"Trouvé dans la cellule [{i},{col}]: '{cell_str}'")
-                            print(f"✅ Lot détecté dans le contenu: {numero_lot} - {nom_lot}")
-                            lots.append(lot_info)
+        # Parcourir les 15 premières lignes de la feuille déjà chargée (celle retenue par _read_best_sheet)
+        top_rows = self.df.iloc[:15]
+        self.logger.debug(f"Recherche dans les {len(top_rows)} premières lignes du fichier")
+        for i, row in enumerate(top_rows.itertuples(index=False)):
+            for col, cell_value in enumerate(row):
+                if pd.isna(cell_value):
+                    continue
+                cell_str = str(cell_value).strip()
+                match = LOT_CONTENT_PATTERN.search(cell_str)
+                if match:
+                    lot_info = (match.group(1).strip(), match.group(2).strip())
+                    self.logger.log_lot_detection("content", True, lot_info, 
+                                                 pattern=LOT_CONTENT_PATTERN.pattern,
+                                                 error=f"Trouvé dans la cellule [{i},{col}]: '{cell_str}'")
+                    print(f"✅ Lot détecté dans le contenu: {lot_info[0]} - {lot_info[1]}")
+                    lots.append(lot_info)
         
         if lots:
             return lots
@@ -843,73 +1021,11 @@ class ExcelParser:
         
         self.logger.debug(f"Analyse du nom de fichier: {filename}")
         
-        # Patterns renforcés pour détecter un lot dans le nom de fichier (ordre de priorité)
-        patterns = [
-            # === PATTERNS STANDARDS ===
-            # LOT 06 - DPGF - METALLERIE (très spécifique)
-            r'lot\s*(\d{1,2})\s*-\s*(?:dpgf|devis|bpu|dqe)\s*-\s*([\w\s\-&°\'\.]+)',
-            
-            # DPGF-Lot 06 Métallerie (avec tiret)
-            r'dpgf\s*[-_]?\s*lot\s*(\d{1,2})\s+([\w\s\-&°\'\.]+)',
-            
-            # LOT 06 - METALLERIE (avec tiret et nom)
-            r'lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
-            
-            # === PATTERNS COMPLEXES ===
-            # 802 DPGF Lot 2 - Curage (numéro au début + lot)
-            r'^\d+\s+dpgf\s+lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
-            
-            # DPGF Lot 6 - Métallerie
-            r'dpgf\s+lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
-            
-            # Lot06_Métallerie ou Lot 06 Métallerie
-            r'lot\s*(\d{1,2})[_\-\s]+([\w\s\-&°\'\.]+)',
-            
-            # === PATTERNS SHAREPOINT ET ENTREPRISES ===
-            # 25S012 - DPGF -Lot4 (pattern spécial SharePoint)
-            r'-\s*dpgf\s*-?\s*lot\s*(\d{1,2})\s*-?\s*([\w\s\-&°\'\.]*)',
-            
-            # [Entreprise] - Lot 03 - Nom du lot
-            r'[\[\(][\w\s]+[\]\)]\s*-\s*lot\s*(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
-            
-            # === PATTERNS AVEC PRÉFIXES ===
-            # DCE_Lot_06_Metallerie
-            r'(?:dce|bce|appel|marche|projet)[-_\s]*lot[-_\s]*(\d{1,2})[-_\s]+([\w\s\-&°\'\.]+)',
-            
-            # Chantier_Nom_Lot06_Description
-            r'(?:chantier|projet|travaux)[-_\s]*[\w\s]*[-_\s]*lot[-_\s]*(\d{1,2})[-_\s]+([\w\s\-&°\'\.]+)',
-            
-            # === PATTERNS AVEC CODES CLIENTS ===
-            # CDC_HABITAT_LOT_6_METALLERIE
-            r'(?:cdc|bnp|axa|vinci|bouygues)[-_\s]*(?:habitat|group|immobilier)?[-_\s]*lot[-_\s]*(\d{1,2})[-_\s]+([\w\s\-&°\'\.]+)',
-            
-            # === PATTERNS ALTERNATIFS ===
-            # LOT6 - Description (collé)
-            r'lot(\d{1,2})\s*-\s*([\w\s\-&°\'\.]+)',
-            
-            # Lot_6_Description (avec underscores)
-            r'lot[-_](\d{1,2})[-_]([\w\s\-&°\'\.]+)',
-            
-            # 06_METALLERIE_LOT (inversé)
-            r'(\d{1,2})[-_\s]*([\w\s\-&°\'\.]+)[-_\s]*lot',
-            
-            # === PATTERNS MINIMALISTES ===
-            # Lot6 (juste numéro, sans description)
-            r'lot\s*(\d{1,2})(?!\d)(?:[^\w\d]|$)',  # Éviter lot123
-            
-            # L06, L6 (format abrégé)
-            r'\bL(\d{1,2})\b',
-            
-            # 6-METALLERIE (sans "lot")
-            r'^(\d{1,2})\s*-\s*([\w\s\-&°\'\.]{5,})',
-            
-            # === PATTERNS DANS LE CHEMIN ===
-            # Chercher aussi dans le chemin du fichier
-            r'[\\/]lot[-_\s]*(\d{1,2})[-_\s]*([\w\s\-&°\'\.]*)',
-        ]
+        # Tous les patterns exigent un chiffre : inutile de les parcourir sinon
+        has_digit = any(c.isdigit() for c in filename)
         
-        for idx, pattern in enumerate(patterns):
-            match = re.search(pattern, filename, re.IGNORECASE)
+        for idx, pattern in enumerate(LOT_FILENAME_PATTERNS if has_digit else []):
+            match = pattern.search(filename)
             if match:
                 try:
                     numero_lot = match.group(1).strip()
@@ -932,7 +1048,7 @@ class ExcelParser:
                     except ValueError:
                         continue
                     
-                    self.logger.debug(f"Pattern #{idx+1} correspondant: '{pattern}' dans '{filename}'")
+                    self.logger.debug(f"Pattern #{idx+1} correspondant: '{pattern.pattern}' dans '{filename}'")
                     print(f"✓ Lot détecté depuis le nom du fichier: {numero_lot} - {nom_lot}")
                     return (numero_lot, nom_lot)
                 except Exception as e:
@@ -961,7 +1077,7 @@ class ExcelParser:
         keywords = ['lot', 'dpgf', 'bpu', 'dqe', 'devis', 'bordereau']
         if any(keyword in filename.lower() for keyword in keywords):
             # Chercher un numéro dans le contexte
-            digit_matches = re.finditer(r'(\d{1,2})', filename)
+            digit_matches = LOT_DIGITS_PATTERN.finditer(filename)
             for match in digit_matches:
                 numero = match.group(1)
                 try:
@@ -985,7 +1101,7 @@ class ExcelParser:
         
         # === ANALYSE DU CHEMIN DU FICHIER ===
         full_path = str(self.file_path)
-        path_match = re.search(r'[\\/]lot[-_\s]*(\d{1,2})[-_\s]*([\w\s\-&°\'\.]*)', full_path, re.IGNORECASE)
+        path_match = LOT_PATH_PATTERN.search(full_path)
         if path_match:
             numero_lot = path_match.group(1)
             nom_lot = self._clean_lot_name(path_match.group(2)) if path_match.group(2) else f"Lot {numero_lot}"
@@ -1364,26 +1480,11 @@ class ExcelParser:
         # Si on a un en-tête, on cherche les correspondances avec des patterns connus
         header_row = [str(val).strip().lower() if pd.notna(val) else "" for val in self.df.iloc[header_row_idx].values]
         
-        # Patterns pour chaque type de colonne
-        patterns = {
-            'designation': [r'désignation', r'designation', r'libellé', r'libelle', r'description', r'prestation', r'article', r'détail', r'detail', r'ouvrage', r'intitulé', r'intitule', r'nature'],
-            'unite': [r'unité', r'unite', r'u\.?$', r'un\.?$', r'un$', r'unité de mesure', r'mesure', r'^u$'],
-            'quantite': [r'quantité', r'quantite', r'qté\.?', r'qt\.?', r'quant\.?', r'qte'],
-            'prix_unitaire': [r'prix\s*(?:unitaire|unit\.?)(?:\s*h\.?t\.?)?', r'p\.u\.(?:\s*h\.?t\.?)?', r'pu(?:\s*h\.?t\.?)?', r'pu\s*ht$', r'prix\s*ht$'],
-            'prix_total': [r'prix\s*(?:total|tot\.?)(?:\s*h\.?t\.?)?', r'montant(?:\s*h\.?t\.?)?', r'p\.t\.(?:\s*h\.?t\.?)?', r'pt(?:\s*h\.?t\.?)?', r'total(?:\s*h\.?t\.?)?']
-        }
-        
-        # Chercher chaque pattern dans les cellules de la ligne d'en-tête
-        for col_name, col_patterns in patterns.items():
-            for col_idx, cell_text in enumerate(header_row):
-                cell_text = cell_text.lower()
-                for pattern in col_patterns:
-                    if re.search(pattern, cell_text, re.IGNORECASE):
-                        column_indices[col_name] = col_idx
-                        print(f"Colonne '{col_name}' détectée: indice {col_idx}, valeur: '{header_row[col_idx]}'")
-                        break
-                if column_indices[col_name] is not None:
-                    break
+        # Correspondances mises en cache par signature d'en-tête
+        for col_name, col_idx in match_header_columns(tuple(header_row)):
+            column_indices[col_name] = col_idx
+            if col_idx is not None:
+                print(f"Colonne '{col_name}' détectée: indice {col_idx}, valeur: '{header_row[col_idx]}'")
         
         # Pour les colonnes non détectées, essayer une détection par position logique
         # Si la désignation n'est pas trouvée, chercher la colonne la plus large avec du texte
@@ -2460,18 +2561,56 @@ class ExcelParser:
         return unit_raw[:10]  # Limiter à 10 caractères
 
 
+# Instructions fixes de détection de lot : préfixe stable du prompt, identique pour tous les fichiers.
+# Ne jamais y insérer d'information propre à un fichier (le contenu est ajouté en suffixe).
+LOT_DETECTION_PREFIX = """
+Analyse ce document DPGF/BPU/DQE et identifie les informations de lot.
+
+TÂCHE:
+1. Identifie le numéro de lot (généralement entre 1 et 99)
+2. Identifie le nom/description du lot
+
+EXEMPLES DE FORMATS POSSIBLES:
+- "LOT 06 - MÉTALLERIE SERRURERIE"
+- "Lot 4 - Charpente & Ossature bois"
+- "DPGF Lot 10 - Platrerie"
+- Ou simplement dans le nom de fichier
+
+RÉPONSE REQUISE:
+Si tu identifies un lot, réponds EXACTEMENT au format:
+LOT_FOUND:numéro|description
+
+Si aucun lot n'est identifié clairement, réponds:
+NO_LOT_FOUND
+
+Exemples de réponses valides:
+LOT_FOUND:06|MÉTALLERIE SERRURERIE
+LOT_FOUND:4|Charpente & Ossature bois
+NO_LOT_FOUND
+"""
+
+
 class GeminiProcessor:
     """Traitement des données avec l'API Gemini"""
     
-    def __init__(self, api_key: str, chunk_size: int = 20):
+    def __init__(self, api_key: str, chunk_size: int = 20, response_cache: 'GeminiResponseCache' = None):
         if not GEMINI_AVAILABLE:
             raise ImportError("Le module google.generativeai n'est pas disponible")
         
         self.api_key = api_key
         self.chunk_size = chunk_size
         self.cache = GeminiCache()
+        self.model_name = 'gemini-1.5-flash'
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model = genai.GenerativeModel(self.model_name)
+        
+        # Cache persistant des réponses de détection de lot
+        self.response_cache = response_cache
+        if self.response_cache is None and GeminiResponseCache is not None:
+            try:
+                self.response_cache = GeminiResponseCache()
+            except Exception as e:
+                print(f"⚠️ Cache des réponses Gemini indisponible: {e}")
         self.stats = ImportStats()
         
         # Flags pour le fallback automatique
@@ -2564,6 +2703,61 @@ class GeminiProcessor:
             
             return result
     
+    def read_lot_payload(self, file_path: str, filename: str) -> str:
+        """
+        Extrait l'en-tête d'un fichier Excel (nom + premières lignes) utilisé pour la détection de lot
+        
+        Args:
+            file_path: Chemin vers le fichier Excel
+            filename: Nom du fichier (pour contexte)
+            
+        Returns:
+            Texte décrivant l'en-tête du fichier
+        """
+        # Lire les premières lignes du fichier pour l'analyse (15 suffisent)
+        rows = read_top_rows(file_path, 15)
+        
+        # Convertir les données en texte pour Gemini
+        content_lines = []
+        content_lines.append(f"NOM DU FICHIER: {filename}")
+        content_lines.append("")
+        
+        # Ajouter le contenu des premières cellules
+        for i, row in enumerate(rows):
+            row_data = row[:10]  # Premières 10 colonnes
+            
+            if any(cell for cell in row_data):  # Ne pas inclure les lignes vides
+                content_lines.append(f"Ligne {i}: " + " | ".join(row_data))
+        
+        return "\n".join(content_lines)
+    
+    def _validate_lot(self, numero_lot: str, nom_lot: str) -> Optional[Tuple[str, str]]:
+        """Valide un lot proposé par Gemini (numéro entre 1 et 99)"""
+        try:
+            int_lot = int(numero_lot)
+            if 1 <= int_lot <= 99:
+                return (numero_lot, nom_lot)
+        except (ValueError, TypeError):
+            pass
+        return None
+    
+    def _get_cached_lot(self, payload: str) -> Tuple[bool, Optional[Tuple[str, str]]]:
+        """Cherche la réponse de détection de lot en cache. Retourne (trouvé, lot)"""
+        if not self.response_cache:
+            return False, None
+        cached = self.response_cache.get(self.response_cache.make_key(self.model_name, payload))
+        if cached is None:
+            return False, None
+        self.stats.cache_hits += 1
+        lot = cached.get('lot')
+        return True, tuple(lot) if lot else None
+    
+    def _set_cached_lot(self, payload: str, lot: Optional[Tuple[str, str]]):
+        """Met en cache la réponse de détection de lot d'un en-tête"""
+        if self.response_cache:
+            self.response_cache.set(self.response_cache.make_key(self.model_name, payload),
+                                    {'lot': list(lot) if lot else None})
+    
     def detect_lot_info(self, file_path: str, filename: str) -> Optional[Tuple[str, str]]:
         """
         Utilise Gemini pour détecter les informations de lot depuis le fichier Excel
@@ -2578,81 +2772,36 @@ class GeminiProcessor:
         try:
             print(f"🧠 Détection du lot avec Gemini depuis {filename}")
             
-            # Lire les premières lignes du fichier pour l'analyse
-            df = pd.read_excel(file_path, nrows=20)  # Les 20 premières lignes suffisent
-            
-            # Convertir les données en texte pour Gemini
-            content_lines = []
-            content_lines.append(f"NOM DU FICHIER: {filename}")
-            content_lines.append("")
-            
-            # Ajouter le contenu des premières cellules
-            for i in range(min(15, len(df))):
-                row_data = []
-                for j in range(min(10, len(df.columns))):  # Premières 10 colonnes
-                    cell_value = df.iloc[i, j]
-                    if pd.notna(cell_value):
-                        row_data.append(str(cell_value).strip())
-                    else:
-                        row_data.append("")
-                
-                if any(cell for cell in row_data):  # Ne pas inclure les lignes vides
-                    content_lines.append(f"Ligne {i}: " + " | ".join(row_data))
+            content_text = self.read_lot_payload(file_path, filename)
             
-            content_text = "\n".join(content_lines)
+            found, cached_lot = self._get_cached_lot(content_text)
+            if found:
+                print(f"   Cache hit pour la détection de lot: {cached_lot}")
+                return cached_lot
+            
+            # Prompt pour Gemini : préfixe fixe + contenu du fichier en suffixe
+            prompt = LOT_DETECTION_PREFIX + "\n" + f"CONTENU DU DOCUMENT:\n{content_text}\n"
             
-            # Prompt pour Gemini
-            prompt = f"""
-Analyse ce document DPGF/BPU/DQE et identifie les informations de lot.
-
-CONTENU DU DOCUMENT:
-{content_text}
-
-TÂCHE:
-1. Identifie le numéro de lot (généralement entre 1 et 99)
-2. Identifie le nom/description du lot
-
-EXEMPLES DE FORMATS POSSIBLES:
-- "LOT 06 - MÉTALLERIE SERRURERIE"
-- "Lot 4 - Charpente & Ossature bois"
-- "DPGF Lot 10 - Platrerie"
-- Ou simplement dans le nom de fichier
-
-RÉPONSE REQUISE:
-Si tu identifies un lot, réponds EXACTEMENT au format:
-LOT_FOUND:numéro|description
-
-Si aucun lot n'est identifié clairement, réponds:
-NO_LOT_FOUND
-
-Exemples de réponses valides:
-LOT_FOUND:06|MÉTALLERIE SERRURERIE
-LOT_FOUND:4|Charpente & Ossature bois
-NO_LOT_FOUND
-"""
-
             # Appel à Gemini
+            self.stats.gemini_calls += 1
             response = self.model.generate_content(prompt)
             response_text = response.text.strip()
             
             print(f"   Réponse Gemini: {response_text}")
             
             # Parser la réponse
+            lot = None
             if response_text.startswith("LOT_FOUND:"):
                 lot_info = response_text.replace("LOT_FOUND:", "").strip()
                 if "|" in lot_info:
                     parts = lot_info.split("|", 1)
-                    numero_lot = parts[0].strip()
-                    nom_lot = parts[1].strip()
-                    
-                    # Validation du numéro de lot
-                    try:
-                        int_lot = int(numero_lot)
-                        if 1 <= int_lot <= 99:
-                            print(f"✅ Lot détecté par Gemini: {numero_lot} - {nom_lot}")
-                            return (numero_lot, nom_lot)
-                    except ValueError:
-                        pass
+                    lot = self._validate_lot(parts[0].strip(), parts[1].strip())
+            
+            self._set_cached_lot(content_text, lot)
+            
+            if lot:
+                print(f"✅ Lot détecté par Gemini: {lot[0]} - {lot[1]}")
+                return lot
             
             print("⚠️ Gemini n'a pas pu identifier un lot valide")
             return None
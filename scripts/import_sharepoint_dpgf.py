@@ -9,6 +9,7 @@ import sys
 import tempfile
 import datetime
 import argparse
+import logging
 from pathlib import Path
 from typing import List, Dict, Optional
 import requests
@@ -18,6 +19,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
 
+# Traces complètes des erreurs uniquement en DEBUG (DPGF_LOG=DEBUG)
+logging.basicConfig(level=os.environ.get('DPGF_LOG', 'INFO'), format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
 print("==== DÉMARRAGE DU SCRIPT IMPORT_SHAREPOINT_DPGF ====")
 print(f"Version Python: {sys.version}")
 print(f"Répertoire courant: {os.getcwd()}")
@@ -34,8 +39,7 @@ try:
     print("Module settings importé avec succès")
 except Exception as e:
     print(f"ERREUR lors de l'import des settings: {e}")
-    import traceback
-    traceback.print_exc()
+    logger.debug("Trace de l'erreur", exc_info=True)
 
 # Importer le script d'import unifié
 try:
@@ -45,8 +49,7 @@ try:
     print("Module UnifiedDPGFImporter importé avec succès")
 except Exception as e:
     print(f"ERREUR lors de l'import de UnifiedDPGFImporter: {e}")
-    import traceback
-    traceback.print_exc()
+    logger.debug("Trace de l'erreur", exc_info=True)
 
 class SharePointDPGFImporter:
     """Classe pour importer des DPGF depuis SharePoint"""
@@ -513,8 +516,7 @@ class SharePointDPGFImporter:
             
         except Exception as e:
             print(f"❌ Erreur lors de l'import du fichier {file_path}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.debug("Trace de l'erreur", exc_info=True)
             return None
     
     def list_all_drives(self):
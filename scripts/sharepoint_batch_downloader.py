@@ -11,16 +11,20 @@ from pathlib import Path
 from typing import List, Dict
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Ajouter le répertoire parent au PATH pour les imports
 sys.path.append(str(Path(__file__).parent))
 
 try:
-    from identify_relevant_files_sharepoint import SharePointClient, FileIdentifier
+    from identify_relevant_files_sharepoint import FileIdentifier, get_client
 except ImportError:
     print("❌ Erreur d'import du module SharePoint")
     sys.exit(1)
 
+# Téléchargements simultanés : l'écriture d'un fichier se recouvre avec la réception des suivants
+DOWNLOAD_MAX_WORKERS = 4
+
 def download_specific_files(sharepoint_url: str, file_list: List[Dict], output_dir: str) -> List[Dict]:
     """
     Télécharge une liste spécifique de fichiers depuis SharePoint
@@ -33,7 +37,7 @@ def download_specific_files(sharepoint_url: str, file_list: List[Dict], output_d
     Returns:
         List[Dict]: Liste des fichiers téléchargés avec succès
     """
-    client = SharePointClient()
+    client = get_client()
     
     # Parse l'URL SharePoint pour extraire le chemin du dossier
     try:
@@ -46,27 +50,50 @@ def download_specific_files(sharepoint_url: str, file_list: List[Dict], output_d
     downloaded_files = []
     os.makedirs(output_dir, exist_ok=True)
     
+    # Réserver les chemins de destination avant de lancer les téléchargements en parallèle
+    planned = []
+    reserved_paths = set()
     for file_info in file_list:
+        file_name = file_info.get('name', 'unknown.xlsx')
+        file_id = file_info.get('sharepoint_id')
+        
+        if not file_id:
+            print(f"⚠️ ID SharePoint manquant pour {file_name}")
+            continue
+        
+        # Créer le chemin de destination
+        local_path = os.path.join(output_dir, file_name)
+        
+        # Éviter les doublons (fichiers existants et fichiers de ce lot)
+        counter = 1
+        base_name, ext = os.path.splitext(local_path)
+        while local_path in reserved_paths or os.path.exists(local_path):
+            local_path = f"{base_name}_{counter}{ext}"
+            counter += 1
+        reserved_paths.add(local_path)
+        planned.append((file_info, file_id, local_path))
+    
+    # URLs de téléchargement du lot récupérées en requêtes groupées (20 fichiers par appel)
+    try:
+        download_urls = client.batch_get_download_urls([file_id for _, file_id, _ in planned])
+    except Exception as e:
+        print(f"⚠️ Préchargement des URLs impossible, téléchargement fichier par fichier: {str(e)}")
+        download_urls = {}
+    
+    def download(task):
+        file_info, file_id, local_path = task
         try:
+            return client.download_file(file_id, local_path, download_urls.get(file_id)), None
+        except Exception as e:
+            return False, e
+    
+    # Télécharger les fichiers (résultats affichés dans l'ordre du lot)
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_MAX_WORKERS) as executor:
+        for (file_info, file_id, local_path), (success, error) in zip(planned, executor.map(download, planned)):
             file_name = file_info.get('name', 'unknown.xlsx')
-            file_id = file_info.get('sharepoint_id')
-            
-            if not file_id:
-                print(f"⚠️ ID SharePoint manquant pour {file_name}")
-                continue
-            
-            # Créer le chemin de destination
-            local_path = os.path.join(output_dir, file_name)
-            
-            # Éviter les doublons
-            counter = 1
-            base_name, ext = os.path.splitext(local_path)
-            while os.path.exists(local_path):
-                local_path = f"{base_name}_{counter}{ext}"
-                counter += 1
-            
-            # Télécharger le fichier
-            if client.download_file(file_id, local_path):
+            if error is not None:
+                print(f"❌ Erreur téléchargement {file_name}: {str(error)}")
+            elif success:
                 downloaded_info = file_info.copy()
                 downloaded_info['local_path'] = local_path
                 downloaded_info['downloaded'] = True
@@ -74,9 +101,6 @@ def download_specific_files(sharepoint_url: str, file_list: List[Dict], output_d
                 print(f"✅ Téléchargé: {file_name}")
             else:
                 print(f"❌ Échec téléchargement: {file_name}")
-                
-        except Exception as e:
-            print(f"❌ Erreur téléchargement {file_info.get('name', 'unknown')}: {str(e)}")
     
     return downloaded_files
 
@@ -8,42 +8,56 @@ Ce script permet de tester facilement les deux approches sur un même fichier
 et de comparer les résultats.
 """
 import argparse
+import mimetypes
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import json
 from pathlib import Path
 import time
 
+# Encodeur multipart en flux (optionnel) : le fichier est envoyé par blocs sans être chargé en mémoire
+try:
+    from requests_toolbelt import MultipartEncoder
+    STREAMING_UPLOAD_AVAILABLE = True
+except ImportError:
+    STREAMING_UPLOAD_AVAILABLE = False
 
-def test_import_modes(file_path, api_url="http://127.0.0.1:8000"):
+
+MODES = [
+    ("Mode 1: Service intégré à l'API", False),
+    ("Mode 2: Script de production", True),
+]
+
+# Session partagée : les imports successifs réutilisent la même connexion keep-alive vers l'API
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=10))
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=10))
+
+
+def run_import_mode(file_path, filename, api_url, use_production_script, session=SESSION):
     """
-    Teste les deux modes d'import sur un même fichier DPGF
-    et affiche les résultats pour comparaison.
+    Envoie le fichier à l'endpoint d'upload avancé pour un mode donné
+    et affiche le résultat.
     
     Args:
-        file_path: Chemin vers le fichier DPGF à tester
+        file_path: Chemin vers le fichier DPGF
+        filename: Nom du fichier envoyé à l'API
         api_url: URL de l'API
+        use_production_script: True pour le script de production
+        session: Session HTTP utilisée pour l'envoi
     """
-    if not os.path.exists(file_path):
-        print(f"❌ Fichier introuvable: {file_path}")
-        return
-    
-    filename = Path(file_path).name
-    
-    print(f"🧪 Test d'import pour {filename}")
-    print(f"API: {api_url}")
-    print("-" * 50)
-    
-    # 1. Test avec le service intégré
-    print("\n📊 Mode 1: Service intégré à l'API")
+    flag = "true" if use_production_script else "false"
+    url = f"{api_url}/api/v1/dpgf/upload-advanced?use_production_script={flag}"
+    mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
     try:
         with open(file_path, "rb") as f:
-            files = {"file": (filename, f)}
             start_time = time.time()
-            response = requests.post(
-                f"{api_url}/api/v1/dpgf/upload-advanced?use_production_script=false", 
-                files=files
-            )
+            if STREAMING_UPLOAD_AVAILABLE:
+                encoder = MultipartEncoder(fields={"file": (filename, f, mime_type)})
+                response = session.post(url, data=encoder, headers={"Content-Type": encoder.content_type})
+            else:
+                response = session.post(url, files={"file": (filename, f, mime_type)})
         elapsed = time.time() - start_time
         
         if response.status_code == 200:
@@ -60,35 +74,30 @@ def test_import_modes(file_path, api_url="http://127.0.0.1:8000"):
             print(response.text)
     except Exception as e:
         print(f"❌ Erreur: {e}")
+
+
+def test_import_modes(file_path, api_url="http://127.0.0.1:8000"):
+    """
+    Teste les deux modes d'import sur un même fichier DPGF
+    et affiche les résultats pour comparaison.
+    
+    Args:
+        file_path: Chemin vers le fichier DPGF à tester
+        api_url: URL de l'API
+    """
+    if not os.path.exists(file_path):
+        print(f"❌ Fichier introuvable: {file_path}")
+        return
     
-    print("-" * 50)
+    filename = Path(file_path).name
     
-    # 2. Test avec le script de production
-    print("\n📊 Mode 2: Script de production")
-    try:
-        with open(file_path, "rb") as f:
-            files = {"file": (filename, f)}
-            start_time = time.time()
-            response = requests.post(
-                f"{api_url}/api/v1/dpgf/upload-advanced?use_production_script=true", 
-                files=files
-            )
-        elapsed = time.time() - start_time
-        
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ Import réussi en {elapsed:.2f} secondes")
-            print(f"  - DPGF ID: {result.get('dpgf_id')}")
-            print(f"  - Méthode: {result.get('method')}")
-            print("\n📝 Dernières lignes du log:")
-            for line in result.get("logs", [])[-10:]:
-                if line.strip():
-                    print(f"  {line}")
-        else:
-            print(f"❌ Échec de l'import: {response.status_code}")
-            print(response.text)
-    except Exception as e:
-        print(f"❌ Erreur: {e}")
+    print(f"🧪 Test d'import pour {filename}")
+    print(f"API: {api_url}")
+    
+    for label, use_production_script in MODES:
+        print("-" * 50)
+        print(f"\n📊 {label}")
+        run_import_mode(file_path, filename, api_url, use_production_script)
 
 
 if __name__ == "__main__":
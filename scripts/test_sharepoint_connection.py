@@ -6,11 +6,19 @@ Vérifie l'environnement et teste la connexion à SharePoint
 import os
 import sys
 import datetime
+import logging
 from pathlib import Path
-import requests
 import msal
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).parent))
+from identify_relevant_files_sharepoint import graph_batch_requests
+
+logger = logging.getLogger(__name__)
+
+# Variables d'environnement indispensables à l'accès SharePoint
+REQUIRED_VARS = ("TENANT_ID", "CLIENT_ID", "CLIENT_SECRET", "GRAPH_DRIVE_ID")
+
 def main():
     print("===== DIAGNOSTIC D'ACCÈS SHAREPOINT =====")
     print(f"Date et heure: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -19,25 +27,25 @@ def main():
     
     # 1. Vérifier le fichier .env
     env_file = Path('.env')
-    if env_file.exists():
-        print(f"\n✅ Fichier .env trouvé: {env_file.absolute()}")
-        print(f"   Taille: {env_file.stat().st_size} octets")
-        print(f"   Dernière modification: {datetime.datetime.fromtimestamp(env_file.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
-    else:
+    try:
+        env_stat = env_file.stat()
+    except FileNotFoundError:
         print(f"\n❌ Fichier .env non trouvé à l'emplacement: {env_file.absolute()}")
         return
+    print(f"\n✅ Fichier .env trouvé: {env_file.absolute()}")
+    print(f"   Taille: {env_stat.st_size} octets")
+    print(f"   Dernière modification: {datetime.datetime.fromtimestamp(env_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
     
     # 2. Charger les variables d'environnement
     print("\nChargement des variables d'environnement...")
     load_dotenv(dotenv_path=env_file, override=True)
     
-    # 3. Vérifier les variables essentielles
-    required_vars = ["TENANT_ID", "CLIENT_ID", "CLIENT_SECRET", "GRAPH_DRIVE_ID"]
+    # 3. Vérifier les variables essentielles (lues une seule fois, après chargement du .env)
+    env_values = {var: os.getenv(var) for var in REQUIRED_VARS}
     missing_vars = []
     
     print("\nVérification des variables d'environnement:")
-    for var in required_vars:
-        value = os.getenv(var)
+    for var, value in env_values.items():
         if value:
             # Tronquer l'affichage pour les valeurs sensibles
             if var == "CLIENT_SECRET":
@@ -60,10 +68,10 @@ def main():
     print("\nTest de connexion à Microsoft Graph API...")
     
     # Récupérer les variables nécessaires
-    tenant_id = os.getenv("TENANT_ID")
-    client_id = os.getenv("CLIENT_ID")
-    client_secret = os.getenv("CLIENT_SECRET")
-    drive_id = os.getenv("GRAPH_DRIVE_ID")
+    tenant_id = env_values["TENANT_ID"]
+    client_id = env_values["CLIENT_ID"]
+    client_secret = env_values["CLIENT_SECRET"]
+    drive_id = env_values["GRAPH_DRIVE_ID"]
     
     try:
         # Créer l'application MSAL
@@ -94,14 +102,20 @@ def main():
             "Accept": "application/json"
         }
         
-        print("\nTest d'accès aux drives SharePoint...")
-        response = requests.get("https://graph.microsoft.com/v1.0/drives", headers=headers)
+        # Les trois tests d'accès partent en une seule requête $batch
+        print("\nEnvoi des tests d'accès en une requête groupée ($batch)...")
+        drives_response, drive_response, content_response = graph_batch_requests(headers, [
+            "/drives",
+            f"/drives/{drive_id}",
+            f"/drives/{drive_id}/root/children"
+        ])
         
-        if response.status_code != 200:
-            print(f"❌ Échec de l'accès aux drives: {response.status_code}")
-            print(f"   Réponse: {response.text}")
+        print("\nTest d'accès aux drives SharePoint...")
+        if drives_response["status"] != 200:
+            print(f"❌ Échec de l'accès aux drives: {drives_response['status']}")
+            print(f"   Réponse: {drives_response['body']}")
         else:
-            drives = response.json().get("value", [])
+            drives = drives_response["body"].get("value", [])
             print(f"✅ Accès réussi: {len(drives)} drives trouvés")
             
             for i, drive in enumerate(drives[:5], 1):
@@ -114,13 +128,12 @@ def main():
         
         # Test d'accès au drive spécifique
         print(f"\nTest d'accès au drive configuré (ID: {drive_id})...")
-        response = requests.get(f"https://graph.microsoft.com/v1.0/drives/{drive_id}", headers=headers)
         
-        if response.status_code != 200:
-            print(f"❌ Échec de l'accès au drive: {response.status_code}")
-            print(f"   Réponse: {response.text}")
+        if drive_response["status"] != 200:
+            print(f"❌ Échec de l'accès au drive: {drive_response['status']}")
+            print(f"   Réponse: {drive_response['body']}")
         else:
-            drive_info = response.json()
+            drive_info = drive_response["body"]
             print(f"✅ Accès réussi: {drive_info.get('name', 'Sans nom')}")
             print(f"   Type: {drive_info.get('driveType', 'Inconnu')}")
             owner = drive_info.get('owner', {}).get('user', {}).get('displayName', 'Inconnu')
@@ -128,13 +141,12 @@ def main():
         
         # Test d'accès au contenu du drive
         print(f"\nTest d'accès au contenu du drive...")
-        response = requests.get(f"https://graph.microsoft.com/v1.0/drives/{drive_id}/root/children", headers=headers)
         
-        if response.status_code != 200:
-            print(f"❌ Échec de l'accès au contenu: {response.status_code}")
-            print(f"   Réponse: {response.text}")
+        if content_response["status"] != 200:
+            print(f"❌ Échec de l'accès au contenu: {content_response['status']}")
+            print(f"   Réponse: {content_response['body']}")
         else:
-            items = response.json().get("value", [])
+            items = content_response["body"].get("value", [])
             print(f"✅ Accès réussi: {len(items)} éléments à la racine")
             
             folders = [item for item in items if "folder" in item]
@@ -161,8 +173,9 @@ def main():
     except Exception as e:
         print(f"\n❌ Erreur lors du test de connexion:")
         print(f"   {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Trace de l'erreur", exc_info=True)
 
 if __name__ == "__main__":
+    # Traces complètes des erreurs uniquement en DEBUG (DPGF_LOG=DEBUG)
+    logging.basicConfig(level=os.environ.get('DPGF_LOG', 'INFO'), format='%(levelname)s - %(message)s')
     main()
@@ -236,6 +236,7 @@ Vérifie l'état du service et envoie des alertes si nécessaire.
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -270,14 +271,20 @@ def send_alert(message):
 def main():
     print(f"🔍 Monitoring - {datetime.now()}")
     
+    # Vérifications indépendantes lancées en parallèle : le délai d'attente de l'API
+    # (jusqu'à 10 s si elle est arrêtée) ne retarde plus la vérification des logs
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        api_check = executor.submit(check_api_health)
+        logs_check = executor.submit(check_recent_logs)
+    
     # Vérification API
-    if not check_api_health():
+    if not api_check.result():
         send_alert("API DPGF non accessible")
     else:
         print("✅ API accessible")
     
     # Vérification logs récents
-    if not check_recent_logs():
+    if not logs_check.result():
         send_alert("Aucun log récent détecté - Orchestrateur possiblement arrêté")
     else:
         print("✅ Logs récents détectés")